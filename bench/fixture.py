@@ -0,0 +1,131 @@
+import gzip
+import io
+import json
+import os
+import random
+import shutil
+import tarfile
+
+WORDS = ("editor browser terminal library python rust audio video image font theme icon game "
+         "network tool desktop player viewer compiler shell archive manager client server").split()
+REPOS = ("core", "extra")
+CORE_RATIO = 0.05
+INSTALLED_RATIO = 0.05
+AUR_RATIO = 0.5
+
+
+def catalog_names(catalog_path):
+    try:
+        with open(catalog_path) as f:
+            return list(json.load(f).get("packages", {}))
+    except (OSError, ValueError):
+        return []
+
+
+def desc_text(fields):
+    return "".join(f"%{key}%\n" + "".join(f"{value}\n" for value in values) + "\n"
+                   for key, values in fields.items() if values)
+
+
+def parse_desc(text):
+    fields = {}
+    key = None
+    for line in text.splitlines():
+        if line.startswith("%") and line.endswith("%"):
+            key = line[1:-1]
+            fields[key] = []
+        elif line and key:
+            fields[key].append(line)
+    return fields
+
+
+def make_fields(index, name, names, rng):
+    depends = sorted({names[rng.randrange(index)] for _ in range(min(index, 3))})
+    return {
+        "NAME": [name],
+        "VERSION": [f"{index % 9}.{index % 7}.{index % 5}-{1 + index % 3}"],
+        "DESC": [f"A {rng.choice(WORDS)} {rng.choice(WORDS)} for {name}"],
+        "CSIZE": [str(rng.randrange(10000, 5000000))],
+        "ISIZE": [str(rng.randrange(50000, 50000000))],
+        "URL": [f"https://example.org/{name}"],
+        "LICENSE": ["MIT"],
+        "DEPENDS": depends,
+        "PROVIDES": [f"lib{name}.so=1-64"],
+    }
+
+
+def write_db(path, records):
+    with tarfile.open(path, "w:gz") as archive:
+        for fields in records:
+            data = desc_text(fields).encode()
+            member = tarfile.TarInfo(f"{fields['NAME'][0]}-{fields['VERSION'][0]}/desc")
+            member.size = len(data)
+            archive.addfile(member, io.BytesIO(data))
+
+
+def read_db(path):
+    with tarfile.open(path) as archive:
+        for member in archive:
+            if member.isfile() and member.name.endswith("/desc"):
+                yield parse_desc(archive.extractfile(member).read().decode())
+
+
+def read_sync(root):
+    for repo in REPOS:
+        path = os.path.join(root, "sync", f"{repo}.db")
+        if os.path.exists(path):
+            for fields in read_db(path):
+                yield repo, fields
+
+
+def install(root, fields, reason=0):
+    directory = os.path.join(root, "local", f"{fields['NAME'][0]}-{fields['VERSION'][0]}")
+    os.makedirs(directory, exist_ok=True)
+    local = {key: fields.get(key, []) for key in ("NAME", "VERSION", "DESC", "URL", "DEPENDS", "PROVIDES")}
+    local["SIZE"] = fields.get("ISIZE", [])
+    local["REASON"] = [str(reason)] if reason else []
+    with open(os.path.join(directory, "desc"), "w") as f:
+        f.write(desc_text(local))
+
+
+def remove(root, name):
+    local_path = os.path.join(root, "local")
+    for entry in os.listdir(local_path):
+        if entry.rsplit("-", 2)[0] == name:
+            shutil.rmtree(os.path.join(local_path, entry))
+            return True
+    return False
+
+
+def write_aur_dump(path, count, rng):
+    packages = []
+    for index in range(count):
+        name = f"aur-{rng.choice(WORDS)}-{index}"
+        packages.append({
+            "ID": index, "Name": name, "PackageBase": name, "Version": f"{index % 9}.{index % 4}-1",
+            "Description": f"An AUR {rng.choice(WORDS)} {rng.choice(WORDS)}", "URL": f"https://example.org/{name}",
+            "NumVotes": rng.randrange(500), "Popularity": rng.random(), "OutOfDate": None, "Maintainer": "bench",
+            "License": ["GPL"], "Depends": [f"pkg{rng.randrange(count)}"], "Provides": [],
+        })
+    with gzip.open(path, "wt") as f:
+        json.dump(packages, f)
+
+
+def generate(root, count, catalog_path, seed=0):
+    rng = random.Random(seed)
+    names = catalog_names(catalog_path)[:count]
+    names += [f"pkg{index}" for index in range(count - len(names))]
+    rng.shuffle(names)
+    records = [make_fields(index, name, names, rng) for index, name in enumerate(names)]
+    for directory in ("sync", "local", "home"):
+        os.makedirs(os.path.join(root, directory), exist_ok=True)
+    core_count = max(1, int(count * CORE_RATIO))
+    write_db(os.path.join(root, "sync", "core.db"), records[:core_count])
+    write_db(os.path.join(root, "sync", "extra.db"), records[core_count:])
+    with open(os.path.join(root, "pacman.conf"), "w") as f:
+        f.write("[options]\n" + "".join(f"[{repo}]\n" for repo in REPOS))
+    write_aur_dump(os.path.join(root, "aur.json.gz"), int(count * AUR_RATIO), rng)
+    installed = rng.sample(records, int(count * INSTALLED_RATIO))
+    for fields in installed:
+        install(root, fields, reason=rng.choice((0, 1)))
+    return names
@@ -0,0 +1,89 @@
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PAYLOAD = os.urandom(1 << 20)
+
+
+class MirrorHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        latency, rate, status = self.server.profile
+        time.sleep(latency)
+        if status != 200:
+            self.send_error(status)
+            return
+        body = PAYLOAD
+        ranged = self.headers.get("Range", "").startswith("bytes=0-")
+        if ranged:
+            body = PAYLOAD[:int(self.headers["Range"][len("bytes=0-"):]) + 1]
+        self.send_response(206 if ranged else 200)
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("Connection", "close")
+        self.end_headers()
+        for offset in range(0, len(body), 16384):
+            self.wfile.write(body[offset:offset + 16384])
+            time.sleep(16384 / rate)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_mirrors(count, seed):
+    generator = random.Random(seed)
+    mirrors = []
+    for index in range(count):
+        status = 404 if index % 10 == 9 else 200
+        profile = (generator.uniform(0, 0.3), generator.uniform(0.5, 20) * 1024 * 1024, status)
+        server = ThreadingHTTPServer(("127.0.0.1", 0), MirrorHandler)
+        server.daemon_threads = True
+        server.profile = profile
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        mirrors.append((f"http://127.0.0.1:{server.server_address[1]}/$repo/os/$arch", profile))
+    return mirrors
+
+
+class Task:
+    cancelled = False
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rank local HTTP mirrors with injected latency and bandwidth.")
+    parser.add_argument("--mirrors", type=int, default=40, help="number of local mirrors to start")
+    parser.add_argument("--timeout", type=float, default=5, help="probe timeout in seconds")
+    parser.add_argument("--concurrency", type=int, default=16, help="concurrent probes")
+    parser.add_argument("--seed", type=int, default=1)
+    arguments = parser.parse_args()
+    sys.path.insert(0, REPO_DIR)
+    import main as fkinstall
+    mirrors = start_mirrors(arguments.mirrors, arguments.seed)
+    with tempfile.TemporaryDirectory(prefix="fkmirrors-") as root:
+        mirrorlist = os.path.join(root, "mirrorlist")
+        with open(mirrorlist, "w") as f:
+            f.write("".join(f"Server = {server}\n" for server, _ in mirrors))
+        ranker = fkinstall.MirrorRanker(mirrorlist, root, arguments.timeout, arguments.concurrency)
+        start = time.perf_counter()
+        results = [result for chunk in ranker.rank(Task(), ranker.servers()) for result in chunk]
+        elapsed = time.perf_counter() - start
+    profiles = dict(mirrors)
+    ranked = ranker.sort(results)
+    for result in ranked:
+        latency, rate, status = profiles[result["server"]]
+        print(f"{ranker.format_result(result)}  [injected {latency * 1000:.0f} ms, "
+              f"{rate / 1024 / 1024:.1f} MiB/s, HTTP {status}]", file=sys.stderr)
+    json.dump({"mirrors": len(mirrors), "concurrency": arguments.concurrency, "timeout": arguments.timeout,
+               "elapsed_ms": round(elapsed * 1000, 3),
+               "reachable": sum(result["throughput"] is not None for result in results)}, sys.stdout)
+    print()
+
+
+if __name__ == "__main__":
+    main()
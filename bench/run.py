@@ -0,0 +1,195 @@
+import time
+
+START = time.perf_counter()
+
+import argparse
+import inspect
+import json
+import os
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(BENCH_DIR)
+STUBS_DIR = os.path.join(BENCH_DIR, "stubs")
+SEARCH_QUERIES = ["vim", "lib", "pkg12", "editor player", "zzz"]
+TIMEOUT = 120
+STDERR_TAIL_LINES = 20
+
+
+def override_defaults(function, **values):
+    parameters = [parameter for parameter in inspect.signature(function).parameters.values()
+                  if parameter.default is not inspect.Parameter.empty]
+    function.__defaults__ = tuple(values.get(parameter.name, parameter.default) for parameter in parameters)
+
+
+def configure(main, root):
+    override_defaults(main.SyncDatabase.__init__, sync_path=os.path.join(root, "sync"),
+                      pacman_conf=os.path.join(root, "pacman.conf"))
+    override_defaults(main.InstalledPackages.__init__, db_path=os.path.join(root, "local"))
+    override_defaults(main.AurIndex.__init__, source=os.path.join(root, "aur.json.gz"))
+    main.TransactionQueue.LOCK_FILE = os.path.join(root, "db.lck")
+    main.UpdateChecker.TEMP_DB = os.path.join(root, "checkup")
+
+
+def milliseconds(start):
+    return round((time.perf_counter() - start) * 1000, 3)
+
+
+def summarize(samples):
+    return {"median": round(statistics.median(samples), 3), "max": round(max(samples), 3)}
+
+
+def child(root):
+    sys.path.insert(0, REPO_DIR)
+    import main
+    from PyQt5.QtWidgets import QApplication
+    configure(main, root)
+    app = QApplication(sys.argv)
+
+    def wait_until(predicate):
+        deadline = time.perf_counter() + TIMEOUT
+        while not predicate():
+            if time.perf_counter() > deadline:
+                raise TimeoutError("benchmark step timed out")
+            app.processEvents()
+            time.sleep(0.001)
+
+    results = {}
+    window = main.FKInstall()
+    window.show()
+    app.processEvents()
+    results["time_to_window_ms"] = milliseconds(START)
+    wait_until(lambda: window.search_index is not None and "sync-db" not in window.queries.tasks)
+    results["time_to_ready_ms"] = milliseconds(START)
+
+    for label in ("tab_switch_cold_ms", "tab_switch_warm_ms"):
+        samples = []
+        for index in range(window.tabs.count()):
+            start = time.perf_counter()
+            window.tabs.setCurrentIndex(index)
+            window.category_view(index).viewport().repaint()
+            app.processEvents()
+            samples.append(milliseconds(start))
+        results[label] = summarize(samples)
+    window.tabs.setCurrentIndex(0)
+
+    for label, use_yay, use_index in (("search_index_ms", False, True), ("search_aur_index_ms", True, True),
+                                      ("search_command_ms", True, False)):
+        start = time.perf_counter()
+        window.package_manager_switch.setChecked(use_yay)
+        if use_yay and use_index:
+            wait_until(window.aur_index.is_loaded)
+            results["aur_index_load_ms"] = milliseconds(start)
+        if not use_index:
+            window.index_search_available = lambda: False
+        samples = []
+        for query in SEARCH_QUERIES:
+            start = time.perf_counter()
+            window.search_packages(query, notify=False)
+            wait_until(lambda: "search" not in window.queries.tasks)
+            samples.append(milliseconds(start))
+        results[label] = summarize(samples)
+    del window.index_search_available
+    window.package_manager_switch.setChecked(False)
+    window.search_input.clear()
+
+    name = next(name for name in window.sync_db.packages if not window.installed_packages.is_installed(name))
+    subprocess.run([os.path.join(STUBS_DIR, "pacman"), "-S", "--noconfirm", name],
+                   stdout=subprocess.DEVNULL, check=True)
+    start = time.perf_counter()
+    window.update_interface()
+    wait_until(lambda: window.installed_packages.is_installed(name))
+    results["update_interface_after_install_ms"] = milliseconds(start)
+    subprocess.run([os.path.join(STUBS_DIR, "pacman"), "-R", "--noconfirm", name],
+                   stdout=subprocess.DEVNULL, check=True)
+
+    results["peak_rss_kb"] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    window.close()
+    json.dump(results, sys.stdout)
+
+
+def run_child(root, latency):
+    environment = dict(os.environ, FKBENCH_ROOT=root, FKBENCH_LATENCY=str(latency),
+                       HOME=os.path.join(root, "home"), QT_QPA_PLATFORM="offscreen",
+                       PATH=STUBS_DIR + os.pathsep + os.environ.get("PATH", ""))
+    result = subprocess.run([sys.executable, os.path.abspath(__file__), "--child", root],
+                            env=environment, capture_output=True, text=True, timeout=TIMEOUT * 4)
+    if result.returncode != 0:
+        lines = result.stderr.strip().splitlines()
+        tracebacks = [i for i, line in enumerate(lines) if line.startswith("Traceback")]
+        tail = lines[tracebacks[-1]:] if tracebacks else lines[-STDERR_TAIL_LINES:]
+        raise RuntimeError(f"child exited with status {result.returncode}" + "".join(f"\n  {line}" for line in tail))
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def git_revision():
+    try:
+        return subprocess.run(["git", "-C", REPO_DIR, "rev-parse", "--short", "HEAD"],
+                              capture_output=True, text=True).stdout.strip() or None
+    except OSError:
+        return None
+
+
+def flatten(results, prefix=""):
+    values = {}
+    for key, value in results.items():
+        if isinstance(value, dict):
+            values.update(flatten(value, f"{prefix}{key}."))
+        elif isinstance(value, (int, float)):
+            values[prefix + key] = value
+    return values
+
+
+def compare(report, baseline_path):
+    with open(baseline_path) as f:
+        baseline = {(run["packages"], run["latency"], run["start"]): flatten(run)
+                    for run in json.load(f)["runs"]}
+    for run in report["runs"]:
+        previous = baseline.get((run["packages"], run["latency"], run["start"]))
+        if previous is None:
+            continue
+        for metric, value in flatten(run).items():
+            if metric in ("packages", "latency") or not previous.get(metric):
+                continue
+            change = (value - previous[metric]) * 100 / previous[metric]
+            print(f"{run['packages']:>6} {run['start']:<5} {metric:<40} {previous[metric]:>12} -> "
+                  f"{value:>12} ({change:+.1f}%)", file=sys.stderr)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Headless FKInstall benchmarks against synthetic repositories.")
+    parser.add_argument("--sizes", default="1000,10000,50000", help="comma separated repository sizes")
+    parser.add_argument("--latency", type=float, default=0.05, help="seconds each pacman/yay stub call sleeps")
+    parser.add_argument("--output", help="write the JSON report here instead of stdout")
+    parser.add_argument("--compare", help="print per-metric changes against an earlier JSON report")
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    arguments = parser.parse_args()
+    if arguments.child:
+        child(arguments.child)
+        return
+    sys.path.insert(0, BENCH_DIR)
+    import fixture
+    report = {"revision": git_revision(), "python": sys.version.split()[0], "runs": []}
+    for size in [int(size) for size in arguments.sizes.split(",")]:
+        with tempfile.TemporaryDirectory(prefix="fkbench-") as root:
+            fixture.generate(root, size, os.path.join(REPO_DIR, "catalog.json"))
+            for start in ("cold", "warm"):
+                results = run_child(root, arguments.latency)
+                report["runs"].append(dict(packages=size, latency=arguments.latency, start=start, **results))
+                print(f"{size} packages, {start} start: {results['time_to_window_ms']} ms to window",
+                      file=sys.stderr)
+    if arguments.compare:
+        compare(report, arguments.compare)
+    if arguments.output:
+        with open(arguments.output, "w") as f:
+            json.dump(report, f, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,63 +1,2370 @@
 import sys
 import subprocess
 import os
+import re
+import json
+import time
+import signal
+import tempfile
+import shutil
+import itertools
+import functools
+import contextlib
+from collections import OrderedDict, deque
+import gc
+import bisect
+import heapq
+import glob
+import pickle
+import tarfile
+import hashlib
+import struct
+import threading
+import queue
+import gzip
+import urllib.request
+import urllib.error
+import email.utils
+import mmap
+import asyncio
+import ssl
+import urllib.parse
+from array import array
+import multiprocessing
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
 from PyQt5.QtWidgets import (
     QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
     QLabel, QLineEdit, QPushButton, QListWidget, QMessageBox, QProgressBar, QListWidgetItem, QTabWidget,
-    QInputDialog, QCheckBox, QStackedWidget, QScrollArea, QGridLayout, QDialog, QDialogButtonBox
+    QInputDialog, QCheckBox, QStackedWidget, QDialog, QDialogButtonBox, QListView, QStyledItemDelegate, QStyle,
+    QPlainTextEdit, QComboBox, QSpinBox, QFileDialog
 )
-from PyQt5.QtCore import QThread, pyqtSignal, Qt
-from PyQt5.QtGui import QIcon, QPixmap
+from PyQt5.QtCore import (
+    QObject, QRunnable, QThread, QThreadPool, QTimer, pyqtSignal, Qt, QAbstractListModel, QModelIndex,
+    QSize, QRect, QEvent, QPoint, QFileSystemWatcher
+)
+from PyQt5.QtGui import QIcon, QPixmap, QPainter, QColor, QCursor, QImage, QImageReader
+from PyQt5.QtNetwork import QLocalServer, QLocalSocket
+
+
+class ProfileSpan:
+    __slots__ = ("profiler", "name", "args", "start")
+
+    def __init__(self, profiler, name, args):
+        self.profiler = profiler
+        self.name = name
+        self.args = args
+        self.start = 0
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.profiler.add_span(self.name, self.start, time.perf_counter(), self.args)
+        return False
+
+
+class NullSpan:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+class Profiler:
+    ENVIRONMENT_VARIABLE = "FKINSTALL_PROFILE"
+
+    def __init__(self, path="~/.local/share/fkinstall-trace.json", enabled=None):
+        self.path = os.path.expanduser(path)
+        if enabled is None:
+            enabled = os.environ.get(self.ENVIRONMENT_VARIABLE, "") not in ("", "0")
+        self.enabled = enabled
+        self.origin = time.perf_counter()
+        self.events = []
+        self.counters = {}
+        self.lock = threading.Lock()
+        self.null_span = NullSpan()
+
+    def timestamp(self, value):
+        return round((value - self.origin) * 1000000)
+
+    def span(self, name, **args):
+        if not self.enabled:
+            return self.null_span
+        return ProfileSpan(self, name, args)
+
+    def add_span(self, name, start, end, args):
+        event = {"name": name, "ph": "X", "ts": self.timestamp(start),
+                 "dur": self.timestamp(end) - self.timestamp(start),
+                 "pid": os.getpid(), "tid": threading.get_ident(), "args": args}
+        with self.lock:
+            self.events.append(event)
+
+    def count(self, name, value=1):
+        if not self.enabled:
+            return
+        with self.lock:
+            total = self.counters[name] = self.counters.get(name, 0) + value
+            self.events.append({"name": name, "ph": "C", "ts": self.timestamp(time.perf_counter()),
+                                "pid": os.getpid(), "args": {name: total}})
+
+    def process_finished(self, command, start):
+        if not self.enabled:
+            return
+        end = time.perf_counter()
+        self.add_span("subprocess", start, end, {"command": " ".join(command)})
+        self.count("subprocesses")
+        self.count("subprocess_ms", round((end - start) * 1000, 3))
+
+    def save(self):
+        if not self.enabled:
+            return
+        with self.lock:
+            data = {"traceEvents": list(self.events), "displayTimeUnit": "ms", "otherData": dict(self.counters)}
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            with open(self.path, "w") as f:
+                json.dump(data, f)
+        except OSError:
+            pass
+
+
+PROFILER = Profiler()
 
 
 class Worker(QThread):
     finished = pyqtSignal(str)
     error = pyqtSignal(str)
+    output = pyqtSignal(str)
+    progress = pyqtSignal(int, str)
+
+    LINE_END = re.compile(rb"[\r\n]")
+    STEP = re.compile(r"^\((\d+)/(\d+)\)\s+(.*?)(?:\s+\[[#\- ]*\])?(?:\s+\d{1,3}%)?$")
+    PERCENT = re.compile(r"(\d{1,3})%\s*$")
+    DOWNLOAD = re.compile(r"^\s*(\S+)\s+([\d.]+)\s+(B|KiB|MiB|GiB)\s+([\d.]+\s+\S+/s)")
+    TOTAL_DOWNLOAD = re.compile(r"Total Download Size:\s+([\d.]+)\s+(B|KiB|MiB|GiB)")
+    UNITS = {"B": 1, "KiB": 1024, "MiB": 1024 ** 2, "GiB": 1024 ** 3}
+    ERROR_TAIL = 20
+    CANCEL_GRACE = 5000
 
     def __init__(self, command, password=None):
         super().__init__()
         self.command = command
         self.password = password
+        self.process = None
+        self.cancelled = False
+        self.download_total = 0
+        self.downloaded = 0
+        self.last_progress = None
 
     def run(self):
+        start = time.perf_counter()
         try:
-            process = subprocess.Popen(
+            self.process = subprocess.Popen(
                 self.command,
                 stdin=subprocess.PIPE,
                 stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                universal_newlines=True
+                stderr=subprocess.STDOUT,
+                start_new_session=True
             )
             if self.password:
-                process.stdin.write(self.password + "\n")
-                process.stdin.flush()
+                self.process.stdin.write((self.password + "\n").encode())
+                self.process.stdin.flush()
+            self.process.stdin.close()
 
-            stdout, stderr = process.communicate()
+            lines = []
+            buffer = b""
+            fd = self.process.stdout.fileno()
+            while True:
+                data = os.read(fd, 4096)
+                if not data:
+                    break
+                buffer += data
+                match = self.LINE_END.search(buffer)
+                while match:
+                    segment = buffer[:match.start()].decode("utf-8", "replace").rstrip()
+                    self.handle_segment(segment, buffer[match.start():match.end()] == b"\n", lines)
+                    buffer = buffer[match.end():]
+                    match = self.LINE_END.search(buffer)
+            if buffer:
+                self.handle_segment(buffer.decode("utf-8", "replace").rstrip(), True, lines)
+            self.process.stdout.close()
+            self.process.wait()
+            PROFILER.process_finished(self.command, start)
 
-            if process.returncode == 0:
-                self.finished.emit(stdout)
+            if self.cancelled:
+                self.error.emit("Operation cancelled.")
+            elif self.process.returncode == 0:
+                self.finished.emit("\n".join(lines))
             else:
-                self.error.emit(stderr)
+                self.error.emit("\n".join(lines[-self.ERROR_TAIL:]))
         except Exception as e:
             self.error.emit(str(e))
 
+    def handle_segment(self, text, final, lines):
+        if not text:
+            return
+        if final:
+            lines.append(text)
+            self.output.emit(text)
+        total = self.TOTAL_DOWNLOAD.search(text)
+        if total:
+            self.download_total = self.to_bytes(total.group(1), total.group(2))
+            return
+        download = self.DOWNLOAD.match(text)
+        percent = self.PERCENT.search(text)
+        if download:
+            size = self.to_bytes(download.group(2), download.group(3))
+            fraction = int(percent.group(1)) / 100 if percent else 0
+            label = f"Downloading {download.group(1)} ({download.group(2)} {download.group(3)}, {download.group(4)})"
+            if self.download_total:
+                self.report(int((self.downloaded + size * fraction) * 100 / self.download_total), label)
+            else:
+                self.report(int(fraction * 100), label)
+            if fraction >= 1:
+                self.downloaded += size
+            return
+        step = self.STEP.match(text)
+        if step:
+            index, count = int(step.group(1)), max(1, int(step.group(2)))
+            fraction = int(percent.group(1)) / 100 if percent else 1
+            self.report(int((index - 1 + fraction) * 100 / count), step.group(3))
+        elif percent and not final:
+            self.report(int(percent.group(1)), "")
+
+    def to_bytes(self, value, unit):
+        return int(float(value) * self.UNITS[unit])
+
+    def report(self, value, label):
+        value = max(0, min(100, value))
+        if (value, label) != self.last_progress:
+            self.last_progress = (value, label)
+            self.progress.emit(value, label)
+
+    def cancel(self):
+        self.cancelled = True
+        self.signal_process(signal.SIGINT)
+        QTimer.singleShot(self.CANCEL_GRACE, lambda: self.signal_process(signal.SIGTERM))
+        QTimer.singleShot(self.CANCEL_GRACE * 2, lambda: self.signal_process(signal.SIGKILL))
+
+    def signal_process(self, signum):
+        process = self.process
+        if process is None or process.poll() is not None:
+            return
+        try:
+            os.killpg(process.pid, signum)
+        except OSError:
+            try:
+                process.send_signal(signum)
+            except OSError:
+                pass
+
+
+class InstalledPackages:
+    def __init__(self, db_path="/var/lib/pacman/local", packages=None):
+        self.db_path = db_path
+        self.packages = {}
+        if packages is None:
+            self.refresh()
+        else:
+            self.packages = packages
+
+    def refresh(self):
+        self.packages = self.load()
+
+    def diff(self, packages):
+        added = [name for name in packages if name not in self.packages]
+        removed = [name for name in self.packages if name not in packages]
+        changed = [name for name, version in packages.items()
+                   if name in self.packages and self.packages[name] != version]
+        return added, removed, changed
+
+    def load(self):
+        packages = self.read_local_db()
+        if packages is None:
+            packages = self.query_pacman()
+        return packages
+
+    def read_local_db(self):
+        try:
+            entries = os.listdir(self.db_path)
+        except OSError:
+            return None
+        packages = {}
+        for entry in entries:
+            parts = entry.rsplit("-", 2)
+            if len(parts) == 3:
+                packages[parts[0]] = f"{parts[1]}-{parts[2]}"
+        return packages
+
+    def query_pacman(self):
+        start = time.perf_counter()
+        try:
+            result = subprocess.run(["pacman", "-Q"], capture_output=True, text=True)
+        except Exception:
+            return {}
+        PROFILER.process_finished(["pacman", "-Q"], start)
+        packages = {}
+        for line in result.stdout.splitlines():
+            parts = line.split()
+            if len(parts) == 2:
+                packages[parts[0]] = parts[1]
+        return packages
+
+    def is_installed(self, package_name):
+        return package_name in self.packages
+
+    def load_records(self):
+        records = {}
+        try:
+            entries = os.listdir(self.db_path)
+        except OSError:
+            return records
+        for entry in entries:
+            try:
+                with open(os.path.join(self.db_path, entry, "desc"), errors="replace") as f:
+                    fields = parse_desc(f.read())
+            except OSError:
+                continue
+            if not fields.get("NAME"):
+                continue
+            records[fields["NAME"][0]] = {
+                "name": fields["NAME"][0],
+                "version": fields.get("VERSION", [""])[0],
+                "isize": int(fields.get("SIZE", ["0"])[0]),
+                "reason": int(fields.get("REASON", ["0"])[0]),
+                "depends": fields.get("DEPENDS", []),
+                "provides": fields.get("PROVIDES", []),
+                "conflicts": fields.get("CONFLICTS", []),
+                "replaces": fields.get("REPLACES", []),
+                "optdepends": [optional.split(":", 1)[0] for optional in fields.get("OPTDEPENDS", [])],
+            }
+        return records
+
+    def installed_size(self, package_name):
+        version = self.packages.get(package_name)
+        try:
+            with open(os.path.join(self.db_path, f"{package_name}-{version}", "desc")) as f:
+                sizes = parse_desc(f.read()).get("SIZE")
+            return int(sizes[0]) if sizes else 0
+        except (OSError, ValueError):
+            return 0
+
+    def version(self, package_name):
+        return self.packages.get(package_name)
+
+
+class TransactionJob:
+    def __init__(self, action, package_name, use_yay, targets=None):
+        self.action = action
+        self.package_name = package_name
+        self.use_yay = use_yay
+        self.targets = targets
+        self.status = "pending"
+
+    def package_names(self):
+        if self.targets is not None:
+            return list(self.targets["packages"])
+        return [self.package_name] if self.package_name else []
+
+    def describe(self):
+        if self.targets is not None and self.action == "cleanup":
+            return (f"[{self.status}] {self.action} {len(self.targets['packages'])} orphans, "
+                    f"{len(self.targets['files'])} cached files")
+        if self.action == "mirrorlist":
+            return f"[{self.status}] write mirrorlist {self.targets['files'][1]}"
+        if self.targets is not None:
+            return f"[{self.status}] {self.action} {len(self.targets['packages'])} local packages"
+        if self.package_name is None:
+            return f"[{self.status}] {self.action} system"
+        return f"[{self.status}] {self.action} {self.package_name}"
+
+
+class TransactionQueue(QObject):
+    jobs_changed = pyqtSignal()
+    transaction_started = pyqtSignal(str)
+    transaction_finished = pyqtSignal(str, str)
+    transaction_failed = pyqtSignal(str, str)
+    transaction_cancelled = pyqtSignal(str)
+    transaction_recorded = pyqtSignal(object)
+    output = pyqtSignal(str)
+    progress = pyqtSignal(int, str)
+
+    LOCK_FILE = "/var/lib/pacman/db.lck"
+    BATCH_DELAY = 500
+    LOCK_RETRY_DELAY = 1000
+    HISTORY_SIZE = 50
+    CLEANUP_SCRIPT = ('orphans=$1; shift; status=0; '
+                      'if [ -n "$orphans" ]; then pacman -Rns --noconfirm $orphans || status=$?; fi; '
+                      'if [ $# -gt 0 ]; then rm -fv -- "$@" || status=$?; fi; exit $status')
+    MIRRORLIST_SCRIPT = 'cp -fv -- "$2" "$2.bak" && install -v -m 644 -- "$1" "$2"'
+
+    def __init__(self, ask_password, confirm):
+        super().__init__()
+        self.ask_password = ask_password
+        self.confirm = confirm
+        self.jobs = []
+        self.running = []
+        self.worker = None
+        self.started = 0
+        self.dispatch_timer = QTimer(self)
+        self.dispatch_timer.setSingleShot(True)
+        self.dispatch_timer.timeout.connect(self.dispatch)
+
+    def enqueue(self, action, package_name, use_yay, targets=None):
+        for job in self.jobs:
+            if (job.status == "pending" and job.action == action and job.package_name == package_name
+                    and job.use_yay == use_yay and job.targets == targets):
+                return
+        self.jobs.append(TransactionJob(action, package_name, use_yay, targets))
+        self.trim_history()
+        self.jobs_changed.emit()
+        if self.worker is None:
+            self.dispatch_timer.start(self.BATCH_DELAY)
+
+    def pending(self):
+        return [job for job in self.jobs if job.status in ("pending", "waiting")]
+
+    def trim_history(self):
+        finished = [job for job in self.jobs if job.status in ("done", "failed", "cancelled")]
+        for job in finished[:max(0, len(finished) - self.HISTORY_SIZE)]:
+            self.jobs.remove(job)
+
+    def command(self, action, package_names, use_yay, targets=None):
+        if action == "cleanup":
+            return ["sudo", "-S", "sh", "-c", self.CLEANUP_SCRIPT, "sh", " ".join(package_names)] + targets["files"]
+        if action == "mirrorlist":
+            return ["sudo", "-S", "sh", "-c", self.MIRRORLIST_SCRIPT, "sh"] + targets["files"]
+        if action == "local-install":
+            return ["sudo", "-S", "pacman", "-U", "--noconfirm"] + targets["files"]
+        if action == "upgrade":
+            return ["yay", "-Syu", "--noconfirm"] if use_yay else ["sudo", "-S", "pacman", "-Syu", "--noconfirm"]
+        flag = "-S" if action == "install" else "-R"
+        if use_yay:
+            return ["yay", flag, "--noconfirm"] + package_names
+        return ["sudo", "-S", "pacman", flag, "--noconfirm"] + package_names
 
-class LoadingDialog(QDialog):
+    def set_status(self, jobs, status):
+        for job in jobs:
+            job.status = status
+        self.jobs_changed.emit()
+
+    def dispatch(self):
+        pending = self.pending()
+        if self.worker is not None or not pending:
+            return
+        first = pending[0]
+        batch = [job for job in pending if job.action == first.action and job.use_yay == first.use_yay]
+        if first.action in ("upgrade", "cleanup", "local-install", "mirrorlist"):
+            batch = [first]
+        if os.path.exists(self.LOCK_FILE):
+            self.set_status(batch, "waiting")
+            self.dispatch_timer.start(self.LOCK_RETRY_DELAY)
+            return
+        package_names = [name for job in batch for name in job.package_names()]
+        if not self.confirm(first.action, package_names):
+            self.set_status(batch, "cancelled")
+            self.dispatch_timer.start(0)
+            return
+        password = None
+        if not first.use_yay:
+            password = self.ask_password()
+            if not password:
+                self.set_status(batch, "cancelled")
+                self.dispatch_timer.start(0)
+                return
+        self.running = batch
+        self.set_status(batch, "running")
+        self.worker = Worker(self.command(first.action, package_names, first.use_yay, first.targets), password)
+        self.worker.finished.connect(lambda output: self.on_worker_done("done", output))
+        self.worker.error.connect(lambda error: self.on_worker_done("failed", error))
+        self.worker.output.connect(self.output)
+        self.worker.progress.connect(self.progress)
+        self.transaction_started.emit(first.action)
+        self.started = time.time()
+        self.worker.start()
+
+    def on_worker_done(self, status, output):
+        action = self.running[0].action
+        if self.worker.cancelled:
+            status = "cancelled"
+        self.worker.wait()
+        process = self.worker.process
+        self.transaction_recorded.emit({
+            "started": self.started,
+            "action": action,
+            "packages": [name for job in self.running for name in job.package_names()],
+            "use_yay": self.running[0].use_yay,
+            "status": status,
+            "exit_code": process.returncode if process is not None else None,
+            "output": output,
+        })
+        self.set_status(self.running, status)
+        self.running = []
+        self.worker = None
+        self.trim_history()
+        if status == "done":
+            self.transaction_finished.emit(action, output)
+        elif status == "cancelled":
+            self.transaction_cancelled.emit(action)
+        else:
+            self.transaction_failed.emit(action, output)
+        self.dispatch_timer.start(0)
+
+    def cancel(self):
+        self.dispatch_timer.stop()
+        self.set_status(self.pending(), "cancelled")
+        if self.worker is not None:
+            self.worker.cancel()
+
+
+class TransactionLog:
+    MAX_SIZE = 1024 * 1024
+    BACKUP_COUNT = 5
+    FLUSH_INTERVAL = 1.0
+    OUTPUT_LIMIT = 4000
+    HISTORY_SIZE = 200
+    TAIL_SIZE = 256 * 1024
+
+    def __init__(self, path="~/.local/share/fkinstall.log"):
+        self.path = os.path.expanduser(path)
+        self.history = deque(maxlen=self.HISTORY_SIZE)
+        self.queue = queue.Queue()
+        self.load_history()
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+
+    def load_history(self):
+        lines = self.read_tail()
+        if len(lines) < self.HISTORY_SIZE:
+            try:
+                with gzip.open(f"{self.path}.1.gz", "rb") as f:
+                    lines = f.read().split(b"\n") + lines
+            except OSError:
+                pass
+        for line in lines:
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                continue
+            if isinstance(entry, dict) and "action" in entry:
+                self.history.append(entry)
+
+    def read_tail(self):
+        try:
+            with open(self.path, "rb") as f:
+                size = f.seek(0, os.SEEK_END)
+                f.seek(max(0, size - self.TAIL_SIZE))
+                lines = f.read().split(b"\n")
+        except OSError:
+            return []
+        return lines[1:] if size > self.TAIL_SIZE else lines
+
+    def truncate(self, output):
+        if len(output) <= self.OUTPUT_LIMIT:
+            return output
+        return "[...]\n" + output[-self.OUTPUT_LIMIT:]
+
+    def record(self, transaction):
+        entry = {
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S%z", time.localtime(transaction["started"])),
+            "action": transaction["action"],
+            "packages": transaction["packages"],
+            "use_yay": transaction["use_yay"],
+            "status": transaction["status"],
+            "duration": round(time.time() - transaction["started"], 3),
+            "exit_code": transaction["exit_code"],
+            "output": self.truncate(transaction["output"]),
+        }
+        self.history.append(entry)
+        self.queue.put(entry)
+
+    def recent(self, limit=20, action=None, package_name=None):
+        entries = []
+        for entry in reversed(self.history):
+            if action is not None and entry["action"] != action:
+                continue
+            if package_name is not None and package_name not in entry["packages"]:
+                continue
+            entries.append(entry)
+            if len(entries) >= limit:
+                break
+        return entries
+
+    def describe(self, entry):
+        packages = " ".join(entry["packages"]) or "system"
+        return (f"{entry['time']}  {entry['action']} {packages}: {entry['status']} "
+                f"in {entry['duration']:.1f}s (exit code {entry['exit_code']})")
+
+    def run(self):
+        running = True
+        while running:
+            entries = [self.queue.get()]
+            deadline = time.monotonic() + self.FLUSH_INTERVAL
+            while entries[-1] is not None:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    entries.append(self.queue.get(timeout=timeout))
+                except queue.Empty:
+                    break
+            if entries[-1] is None:
+                entries.pop()
+                running = False
+            if entries:
+                self.write(entries)
+
+    def write(self, entries):
+        data = "".join(json.dumps(entry) + "\n" for entry in entries)
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            if os.path.exists(self.path) and os.path.getsize(self.path) + len(data) > self.MAX_SIZE:
+                self.rotate()
+            with open(self.path, "a") as f:
+                f.write(data)
+        except OSError:
+            pass
+
+    def rotate(self):
+        for index in range(self.BACKUP_COUNT - 1, 0, -1):
+            source = f"{self.path}.{index}.gz"
+            if os.path.exists(source):
+                os.replace(source, f"{self.path}.{index + 1}.gz")
+        with open(self.path, "rb") as f, gzip.open(f"{self.path}.1.gz", "wb") as out:
+            shutil.copyfileobj(f, out)
+        os.remove(self.path)
+
+    def close(self):
+        self.queue.put(None)
+        self.thread.join()
+
+
+class TransactionPanel(QListWidget):
     def __init__(self):
         super().__init__()
-        self.setWindowTitle("Loading")
-        self.setFixedSize(300, 100)
-        self.setWindowModality(Qt.ApplicationModal)
-        self.setStyleSheet("""
-            background-color: #2E3440;
-            color: #ECEFF4;
-            font-size: 16px;
-        """)
-        layout = QVBoxLayout()
-        self.label = QLabel("Loading all components, please wait...")
-        self.label.setAlignment(Qt.AlignCenter)
-        layout.addWidget(self.label)
-        self.setLayout(layout)
+        self.setObjectName("transactions")
+        self.setMaximumHeight(120)
+        self.setVisible(False)
+
+    def show_jobs(self, jobs):
+        self.clear()
+        for job in jobs:
+            self.addItem(job.describe())
+        if jobs:
+            self.scrollToBottom()
+        self.setVisible(bool(jobs))
+
+
+class QuerySignals(QObject):
+    chunk = pyqtSignal(object)
+    finished = pyqtSignal()
+    error = pyqtSignal(str)
+
+
+class QueryTask(QRunnable):
+    def __init__(self, function, *args):
+        super().__init__()
+        self.function = function
+        self.args = args
+        self.signals = QuerySignals()
+        self.cancelled = False
+        self.process = None
+
+    def cancel(self):
+        self.cancelled = True
+        process = self.process
+        if process is not None and process.poll() is None:
+            process.terminate()
+
+    def run(self):
+        try:
+            for chunk in self.function(self, *self.args):
+                if self.cancelled:
+                    return
+                self.signals.chunk.emit(chunk)
+        except Exception as e:
+            if not self.cancelled:
+                self.signals.error.emit(str(e))
+            return
+        if not self.cancelled:
+            self.signals.finished.emit()
+
+
+def run_query_command(task, command):
+    start = time.perf_counter()
+    process = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True)
+    task.process = process
+    stdout, _ = process.communicate()
+    PROFILER.process_finished(command, start)
+    return process.returncode, stdout
+
+
+class QueryPool:
+    def __init__(self, max_threads=4):
+        self.pool = QThreadPool()
+        self.pool.setMaxThreadCount(max_threads)
+        self.tasks = {}
+        self.background_channels = itertools.count()
+
+    def submit(self, channel, function, *args, on_chunk=None, on_finished=None, on_error=None):
+        if channel is None:
+            channel = ("background", next(self.background_channels))
+        self.cancel(channel)
+        task = QueryTask(function, *args)
+        if on_chunk:
+            task.signals.chunk.connect(lambda chunk: task.cancelled or on_chunk(chunk))
+        task.signals.finished.connect(lambda: self.on_task_done(channel, task, on_finished))
+        task.signals.error.connect(lambda error: self.on_task_done(channel, task, on_error, error))
+        self.tasks[channel] = task
+        self.pool.start(task)
+        return task
+
+    def on_task_done(self, channel, task, callback, *args):
+        if task.cancelled:
+            return
+        if self.tasks.get(channel) is task:
+            del self.tasks[channel]
+        if callback:
+            callback(*args)
+
+    def cancel(self, channel):
+        task = self.tasks.pop(channel, None)
+        if task is not None:
+            task.cancel()
+
+    def cancel_all(self):
+        for channel in list(self.tasks):
+            self.cancel(channel)
+
+
+class IconService(QObject):
+    icons_ready = pyqtSignal(list)
+
+    SIZE = 64
+    EXTENSIONS = (".png", ".svg", ".xpm")
+    FALLBACK_THEME = "hicolor"
+    PIXMAP_DIRS = ["/usr/share/pixmaps"]
+
+    def __init__(self, queries, cache_dir="~/.cache/fkinstall/icons", capacity=512):
+        super().__init__()
+        self.queries = queries
+        self.capacity = capacity
+        self.pixmaps = OrderedDict()
+        self.pending = set()
+        self.requested = []
+        self.theme = QIcon.themeName() or self.FALLBACK_THEME
+        self.search_paths = [path for path in QIcon.themeSearchPaths() if path.startswith("/")]
+        self.cache_root = os.path.expanduser(cache_dir)
+        self.cache_dir = os.path.join(self.cache_root, f"{self.theme}-{self.theme_mtime()}")
+        self.missing_file = os.path.join(self.cache_dir, "missing")
+        self.missing = self.load_missing()
+        self.theme_dirs = None
+        fallback = QIcon.fromTheme("applications-other")
+        self.placeholder = fallback.pixmap(self.SIZE, self.SIZE)
+        if self.placeholder.isNull():
+            self.placeholder = QPixmap(self.SIZE, self.SIZE)
+            self.placeholder.fill(Qt.transparent)
+
+    def theme_mtime(self):
+        paths = [os.path.join(search_path, theme, filename) for theme in self.theme_chain()
+                 for search_path in self.search_paths for filename in ("index.theme", "icon-theme.cache")]
+        mtime = 0
+        for path in paths + self.PIXMAP_DIRS:
+            try:
+                mtime = max(mtime, int(os.stat(path).st_mtime))
+            except OSError:
+                pass
+        return mtime
+
+    def preload(self, names):
+        for name in names:
+            if name not in self.pixmaps:
+                self.pixmap(name)
+
+    def load_missing(self):
+        try:
+            with open(self.missing_file) as f:
+                return set(f.read().split())
+        except OSError:
+            return set()
+
+    def pixmap(self, name):
+        pixmap = self.pixmaps.get(name)
+        if pixmap is not None:
+            self.pixmaps.move_to_end(name)
+            return pixmap
+        if name not in self.missing and name not in self.pending:
+            self.pending.add(name)
+            self.requested.append(name)
+            if len(self.requested) == 1:
+                QTimer.singleShot(0, self.flush_requests)
+        return self.placeholder
+
+    def flush_requests(self):
+        names, self.requested = self.requested, []
+        self.queries.submit(None, self.query_icons, names, on_chunk=self.on_icons_loaded)
+
+    def query_icons(self, task, names):
+        if self.theme_dirs is None:
+            self.theme_dirs = self.find_theme_dirs()
+            self.prune_cache()
+        loaded = []
+        for name in names:
+            if task.cancelled:
+                return
+            with PROFILER.span("icon_lookup", name=name):
+                loaded.append((name, self.load_image(name)))
+            if len(loaded) >= 32:
+                yield loaded
+                loaded = []
+        if loaded:
+            yield loaded
+
+    def on_icons_loaded(self, loaded):
+        ready = []
+        missing = []
+        for name, image in loaded:
+            self.pending.discard(name)
+            if image is None:
+                self.missing.add(name)
+                missing.append(name)
+                continue
+            self.pixmaps[name] = QPixmap.fromImage(image)
+            ready.append(name)
+        while len(self.pixmaps) > self.capacity:
+            self.pixmaps.popitem(last=False)
+        if missing:
+            self.save_missing(missing)
+        if ready:
+            self.icons_ready.emit(ready)
+
+    def save_missing(self, names):
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            with open(self.missing_file, "a") as f:
+                f.write("".join(f"{name}\n" for name in names))
+        except OSError:
+            pass
+
+    def prune_cache(self):
+        try:
+            entries = os.listdir(self.cache_root)
+        except OSError:
+            return
+        current = os.path.basename(self.cache_dir)
+        for entry in entries:
+            if entry != current:
+                shutil.rmtree(os.path.join(self.cache_root, entry), ignore_errors=True)
+
+    def load_image(self, name):
+        cache_file = os.path.join(self.cache_dir, f"{name}.png")
+        if os.path.exists(cache_file):
+            image = QImage(cache_file)
+            if not image.isNull():
+                return image
+        path = self.find_icon(name)
+        if path is None:
+            return None
+        reader = QImageReader(path)
+        size = reader.size()
+        if not size.isValid() or size.width() > self.SIZE or size.height() > self.SIZE or path.endswith(".svg"):
+            reader.setScaledSize(QSize(self.SIZE, self.SIZE))
+        image = reader.read()
+        if image.isNull():
+            return None
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            image.save(cache_file, "PNG")
+        except OSError:
+            pass
+        return image
+
+    def find_icon(self, name):
+        for directory in self.theme_dirs:
+            for extension in self.EXTENSIONS:
+                path = os.path.join(directory, name + extension)
+                if os.path.isfile(path):
+                    return path
+        return None
+
+    def theme_chain(self):
+        themes = []
+        pending = [self.theme]
+        while pending:
+            theme = pending.pop(0)
+            if theme in themes:
+                continue
+            themes.append(theme)
+            pending.extend(self.theme_inherits(theme))
+        if self.FALLBACK_THEME not in themes:
+            themes.append(self.FALLBACK_THEME)
+        return themes
+
+    def find_theme_dirs(self):
+        themes = self.theme_chain()
+        directories = []
+        for theme in themes:
+            for search_path in self.search_paths:
+                theme_path = os.path.join(search_path, theme)
+                for subdir, size in self.theme_subdirs(theme_path):
+                    directories.append((themes.index(theme), self.size_rank(size), os.path.join(theme_path, subdir)))
+        directories.sort(key=lambda entry: entry[:2])
+        return [entry[2] for entry in directories] + self.PIXMAP_DIRS
+
+    def size_rank(self, size):
+        if size is None:
+            return 0
+        return size - self.SIZE if size >= self.SIZE else 1000 + self.SIZE - size
+
+    def theme_inherits(self, theme):
+        for search_path in self.search_paths:
+            fields = self.read_index_theme(os.path.join(search_path, theme))
+            if fields:
+                inherits = fields.get("Icon Theme", {}).get("Inherits", "")
+                return [name.strip() for name in inherits.split(",") if name.strip()]
+        return []
+
+    def theme_subdirs(self, theme_path):
+        fields = self.read_index_theme(theme_path)
+        subdirs = []
+        for subdir in fields.get("Icon Theme", {}).get("Directories", "").split(","):
+            subdir = subdir.strip()
+            if not subdir:
+                continue
+            section = fields.get(subdir, {})
+            if section.get("Context", "Applications") not in ("Applications", "Apps"):
+                continue
+            if section.get("Type") == "Scalable":
+                subdirs.append((subdir, None))
+            else:
+                try:
+                    subdirs.append((subdir, int(section.get("Size", "0"))))
+                except ValueError:
+                    pass
+        return subdirs
+
+    def read_index_theme(self, theme_path):
+        fields = {}
+        section = None
+        try:
+            with open(os.path.join(theme_path, "index.theme"), errors="replace") as f:
+                for line in f:
+                    line = line.strip()
+                    if line.startswith("[") and line.endswith("]"):
+                        section = fields.setdefault(line[1:-1], {})
+                    elif section is not None and "=" in line:
+                        key, _, value = line.partition("=")
+                        section[key.strip()] = value.strip()
+        except OSError:
+            pass
+        return fields
+
+
+def format_size(value):
+    return f"{value / 1024 / 1024:.2f} MiB"
+
+
+def rpmvercmp(a, b):
+    if a == b:
+        return 0
+    one = two = 0
+    start1 = start2 = 0
+    while one < len(a) and two < len(b):
+        while one < len(a) and not (a[one].isascii() and a[one].isalnum()):
+            one += 1
+        while two < len(b) and not (b[two].isascii() and b[two].isalnum()):
+            two += 1
+        if one >= len(a) or two >= len(b):
+            break
+        if one - start1 != two - start2:
+            return -1 if one - start1 < two - start2 else 1
+        end1, end2 = one, two
+        if a[end1].isdigit():
+            while end1 < len(a) and a[end1].isascii() and a[end1].isdigit():
+                end1 += 1
+            while end2 < len(b) and b[end2].isascii() and b[end2].isdigit():
+                end2 += 1
+            is_number = True
+        else:
+            while end1 < len(a) and a[end1].isascii() and a[end1].isalpha():
+                end1 += 1
+            while end2 < len(b) and b[end2].isascii() and b[end2].isalpha():
+                end2 += 1
+            is_number = False
+        if two == end2:
+            return 1 if is_number else -1
+        segment1, segment2 = a[one:end1], b[two:end2]
+        if is_number:
+            segment1 = segment1.lstrip("0")
+            segment2 = segment2.lstrip("0")
+            if len(segment1) != len(segment2):
+                return 1 if len(segment1) > len(segment2) else -1
+        if segment1 != segment2:
+            return -1 if segment1 < segment2 else 1
+        one = start1 = end1
+        two = start2 = end2
+    if one >= len(a) and two >= len(b):
+        return 0
+    if (one >= len(a) and not (two < len(b) and b[two].isascii() and b[two].isalpha())) or (
+            one < len(a) and a[one].isascii() and a[one].isalpha()):
+        return -1
+    return 1
+
+
+def parse_evr(version):
+    digits = 0
+    while digits < len(version) and version[digits].isascii() and version[digits].isdigit():
+        digits += 1
+    release_start = version.rfind("-", digits)
+    if digits < len(version) and version[digits] == ":":
+        epoch = version[:digits] or "0"
+        rest = version[digits + 1:]
+        release_start -= digits + 1 if release_start != -1 else 0
+    else:
+        epoch = "0"
+        rest = version
+    if release_start != -1:
+        return epoch, rest[:release_start], rest[release_start + 1:]
+    return epoch, rest, None
+
+
+def vercmp(a, b):
+    if a == b:
+        return 0
+    epoch1, version1, release1 = parse_evr(a)
+    epoch2, version2, release2 = parse_evr(b)
+    result = rpmvercmp(epoch1, epoch2)
+    if result == 0:
+        result = rpmvercmp(version1, version2)
+        if result == 0 and release1 and release2:
+            result = rpmvercmp(release1, release2)
+    return result
+
+
+def parse_desc(text):
+    fields = {}
+    key = None
+    for line in text.splitlines():
+        if line.startswith("%") and line.endswith("%") and len(line) > 2:
+            key = line[1:-1]
+            fields[key] = []
+        elif key and line:
+            fields[key].append(line)
+    return fields
+
+
+ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+
+
+@contextlib.contextmanager
+def open_db_archive(path):
+    with open(path, "rb") as f:
+        magic = f.read(4)
+    if magic != ZSTD_MAGIC:
+        with tarfile.open(path, mode="r|*") as archive:
+            yield archive
+        return
+    try:
+        import zstandard
+    except ImportError:
+        zstandard = None
+    if zstandard is not None:
+        with open(path, "rb") as f, zstandard.ZstdDecompressor().stream_reader(f) as stream, \
+                tarfile.open(fileobj=stream, mode="r|") as archive:
+            yield archive
+        return
+    process = subprocess.Popen(["zstd", "-dcq", "--", path], stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+    try:
+        with tarfile.open(fileobj=process.stdout, mode="r|") as archive:
+            yield archive
+    finally:
+        process.kill()
+        process.stdout.close()
+        process.wait()
+
+
+def read_pkginfo(path):
+    fields = {}
+    with open_db_archive(path) as archive:
+        for member in archive:
+            if member.name != ".PKGINFO":
+                continue
+            for line in archive.extractfile(member).read().decode("utf-8", "replace").splitlines():
+                key, separator, value = line.partition(" = ")
+                if separator and not key.startswith("#"):
+                    fields.setdefault(key.strip(), []).append(value.strip())
+            break
+    return fields
+
+
+class PackageCache:
+    FILENAME = re.compile(r"^(.+)-([^-]+-[^-]+)-([^-]+)\.pkg\.tar(?:\.\w+)?$")
+    SCAN_THREADS = 8
+    DEFAULT_KEEP = 3
+
+    def __init__(self, cache_path="/var/cache/pacman/pkg"):
+        self.cache_path = cache_path
+
+    def scan(self, task):
+        try:
+            entries = [entry for entry in os.scandir(self.cache_path) if entry.is_file()]
+        except OSError:
+            return []
+        names = {entry.name for entry in entries}
+        paths = [entry.path for entry in entries
+                 if ".pkg.tar" in entry.name and not entry.name.endswith((".sig", ".part"))]
+        with ThreadPoolExecutor(self.SCAN_THREADS) as pool:
+            packages = [package for package in pool.map(self.inspect, paths) if package is not None]
+            if task.cancelled:
+                return []
+        for package in packages:
+            signature = os.path.basename(package["path"]) + ".sig"
+            package["signature"] = os.path.join(self.cache_path, signature) if signature in names else None
+        return packages
+
+    def inspect(self, path):
+        try:
+            size = os.stat(path).st_size
+        except OSError:
+            return None
+        match = self.FILENAME.match(os.path.basename(path))
+        if match:
+            name, version, arch = match.groups()
+        else:
+            try:
+                fields = read_pkginfo(path)
+            except Exception:
+                return None
+            if not fields.get("pkgname"):
+                return None
+            name, version, arch = (fields["pkgname"][0], fields.get("pkgver", [""])[0],
+                                   fields.get("arch", [""])[0])
+        return {"name": name, "version": version, "arch": arch, "path": path, "size": size}
+
+    def plan(self, packages, keep=DEFAULT_KEEP):
+        groups = {}
+        for package in packages:
+            groups.setdefault((package["name"], package["arch"]), []).append(package)
+        remove = []
+        for versions in groups.values():
+            versions.sort(key=functools.cmp_to_key(lambda a, b: vercmp(a["version"], b["version"])))
+            remove.extend(versions[:max(0, len(versions) - keep)])
+        remove.sort(key=lambda package: package["path"])
+        return remove
+
+    def plan_files(self, plan):
+        files = []
+        for package in plan:
+            files.append(package["path"])
+            if package["signature"]:
+                files.append(package["signature"])
+        return files
+
+
+def read_local_package(path):
+    try:
+        fields = read_pkginfo(path)
+        if not fields.get("pkgname"):
+            return {"path": path, "error": "no .PKGINFO found"}
+        return {"name": fields["pkgname"][0], "version": fields.get("pkgver", [""])[0],
+                "arch": fields.get("arch", [""])[0], "description": fields.get("pkgdesc", [""])[0],
+                "isize": int(fields.get("size", ["0"])[0]), "depends": fields.get("depend", []), "path": path}
+    except Exception as e:
+        return {"path": path, "error": str(e) or type(e).__name__}
+
+
+class LocalRepository:
+    BATCH_SIZE = 64
+
+    def __init__(self, path):
+        self.path = path
+
+    def archives(self):
+        try:
+            entries = [entry for entry in os.scandir(self.path) if entry.is_file()]
+        except OSError:
+            return []
+        return sorted(entry.path for entry in entries
+                      if ".pkg.tar" in entry.name and not entry.name.endswith((".sig", ".part")))
+
+    def scan(self, task):
+        paths = self.archives()
+        if not paths:
+            return
+        workers = min(len(paths), os.cpu_count() or 1)
+        pool = ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context("spawn"))
+        try:
+            batch = []
+            for package in pool.map(read_local_package, paths, chunksize=max(1, len(paths) // (workers * 4))):
+                if task.cancelled:
+                    return
+                batch.append(package)
+                if len(batch) >= self.BATCH_SIZE:
+                    yield batch
+                    batch = []
+            if batch:
+                yield batch
+        finally:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+    def status(self, package, installed_version):
+        if installed_version is None:
+            return "new"
+        result = vercmp(package["version"], installed_version)
+        return "upgrade" if result > 0 else "downgrade" if result < 0 else "installed"
+
+
+class SyncDatabase:
+    CACHE_VERSION = 2
+    DEPENDENCY_NAME = re.compile("[<>=]")
+
+    def __init__(self, sync_path="/var/lib/pacman/sync", cache_dir="~/.cache/fkinstall",
+                 pacman_conf="/etc/pacman.conf"):
+        self.sync_path = sync_path
+        self.cache_file = os.path.join(os.path.expanduser(cache_dir), "sync.pickle")
+        self.pacman_conf = pacman_conf
+        self.packages = {}
+        self.provides = {}
+
+    def repo_order(self):
+        repos = []
+        try:
+            with open(self.pacman_conf) as f:
+                for line in f:
+                    line = line.strip()
+                    if line.startswith("[") and line.endswith("]") and line != "[options]":
+                        repos.append(line[1:-1])
+        except OSError:
+            pass
+        return repos
+
+    def db_files(self, extension=".db"):
+        files = {}
+        for path in glob.glob(os.path.join(self.sync_path, "*" + extension)):
+            files[os.path.basename(path)[:-len(extension)]] = path
+        order = self.repo_order()
+        repos = [repo for repo in order if repo in files]
+        repos += sorted(repo for repo in files if repo not in order)
+        return [(repo, files[repo]) for repo in repos]
+
+    def signature(self, db_files):
+        signature = []
+        for repo, path in db_files:
+            try:
+                signature.append((repo, os.stat(path).st_mtime_ns))
+            except OSError:
+                pass
+        return signature
+
+    def load(self):
+        db_files = self.db_files()
+        signature = self.signature(db_files)
+        data = self.load_cache(signature)
+        if data is None:
+            packages = {}
+            for repo, path in db_files:
+                for record in self.read_db(repo, path):
+                    packages.setdefault(record["name"], record)
+            data = {"packages": packages, "provides": self.build_provides(packages)}
+            self.save_cache(signature, data)
+        self.packages, self.provides = data["packages"], data["provides"]
+
+    def load_cache(self, signature):
+        gc.disable()
+        try:
+            with open(self.cache_file, "rb") as f:
+                data = pickle.load(f)
+        except Exception:
+            return None
+        finally:
+            gc.enable()
+        if data.get("version") != self.CACHE_VERSION or data.get("signature") != signature:
+            return None
+        return data
+
+    def save_cache(self, signature, data):
+        if not signature:
+            return
+        try:
+            os.makedirs(os.path.dirname(self.cache_file), exist_ok=True)
+            tmp_file = self.cache_file + ".tmp"
+            with open(tmp_file, "wb") as f:
+                pickle.dump(dict(data, version=self.CACHE_VERSION, signature=signature),
+                            f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_file, self.cache_file)
+        except OSError:
+            pass
+
+    def read_db(self, repo, path):
+        entries = {}
+        try:
+            with open_db_archive(path) as archive:
+                for member in archive:
+                    if not member.isfile():
+                        continue
+                    directory, _, filename = member.name.rpartition("/")
+                    if filename not in ("desc", "depends"):
+                        continue
+                    text = archive.extractfile(member).read().decode("utf-8", "replace")
+                    entries.setdefault(directory, {}).update(parse_desc(text))
+        except Exception:
+            pass
+        records = []
+        for fields in entries.values():
+            if fields.get("NAME"):
+                records.append(self.make_record(repo, fields))
+        return records
+
+    def make_record(self, repo, fields):
+        def first(key, default=""):
+            values = fields.get(key)
+            return values[0] if values else default
+
+        return {
+            "name": first("NAME"),
+            "repo": repo,
+            "version": first("VERSION"),
+            "description": first("DESC"),
+            "csize": int(first("CSIZE", "0")),
+            "isize": int(first("ISIZE", "0")),
+            "url": first("URL"),
+            "licenses": fields.get("LICENSE", []),
+            "depends": fields.get("DEPENDS", []),
+            "provides": fields.get("PROVIDES", []),
+            "conflicts": fields.get("CONFLICTS", []),
+            "replaces": fields.get("REPLACES", []),
+        }
+
+    def build_provides(self, packages):
+        provides = {}
+        for record in packages.values():
+            for provided in record["provides"]:
+                provided_name = self.DEPENDENCY_NAME.split(provided, 1)[0]
+                provides.setdefault(provided_name, []).append(record["name"])
+        return provides
+
+    def is_loaded(self):
+        return bool(self.packages)
+
+    def info(self, package_name):
+        record = self.packages.get(package_name)
+        if record is None:
+            for provider in self.provides.get(package_name, []):
+                return self.packages[provider]
+        return record
+
+    def format_info(self, record):
+        size = format_size
+        lines = [
+            f"Repository: {record['repo']}",
+            f"Name: {record['name']}",
+            f"Version: {record['version']}",
+            f"Description: {record['description']}",
+            f"URL: {record['url']}",
+            f"Licenses: {'  '.join(record['licenses']) or 'None'}",
+            f"Provides: {'  '.join(record['provides']) or 'None'}",
+            f"Depends On: {'  '.join(record['depends']) or 'None'}",
+            f"Download Size: {size(record['csize'])}",
+            f"Installed Size: {size(record['isize'])}",
+        ]
+        return "\n".join(lines)
+
+
+class FileIndex:
+    MAGIC = b"FKFILES\0"
+    VERSION = 1
+    HEADER = struct.Struct("<8sIQQ")
+    ARRAYS = {"path_offsets": "Q", "path_packages": "I", "basename_order": "I",
+              "package_starts": "I", "package_paths": "I"}
+    SEARCH_LIMIT = 500
+
+    def __init__(self, sync_db, cache_dir="~/.cache/fkinstall"):
+        self.sync_db = sync_db
+        self.index_file = os.path.join(os.path.expanduser(cache_dir), "files.index")
+        self.view = None
+        self.lock = threading.Lock()
+
+    def db_files(self):
+        return self.sync_db.db_files(".files")
+
+    def available(self):
+        return bool(self.db_files())
+
+    def is_loaded(self):
+        return self.view is not None
+
+    def load(self, task):
+        with self.lock:
+            db_files = self.db_files()
+            signature = [list(entry) for entry in self.sync_db.signature(db_files)]
+            if not signature:
+                self.view = None
+                return
+            if self.open(signature) or task.cancelled:
+                return
+            if self.build(task, db_files, signature):
+                self.open(signature)
+
+    def open(self, signature):
+        try:
+            with open(self.index_file, "rb") as f:
+                mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            return False
+        if len(mapped) < self.HEADER.size:
+            return False
+        magic, version, meta_offset, meta_length = self.HEADER.unpack_from(mapped)
+        if magic != self.MAGIC or version != self.VERSION:
+            return False
+        try:
+            meta = json.loads(mapped[meta_offset:meta_offset + meta_length])
+        except ValueError:
+            return False
+        if meta["signature"] != signature:
+            return False
+        memory = memoryview(mapped)
+        arrays = {}
+        for name, typecode in self.ARRAYS.items():
+            offset, length = meta["sections"][name]
+            arrays[name] = memory[offset:offset + length].cast(typecode)
+        packages = meta["packages"]
+        package_ids = {}
+        for i, name in enumerate(packages):
+            package_ids.setdefault(name, i)
+        self.view = (mapped, arrays, meta["sections"]["paths"][0], packages, package_ids)
+        return True
+
+    def build(self, task, db_files, signature):
+        packages = []
+        entries = []
+        for repo, path in db_files:
+            try:
+                with open_db_archive(path) as archive:
+                    for member in archive:
+                        if task.cancelled:
+                            return False
+                        directory, _, filename = member.name.rpartition("/")
+                        if filename != "files" or not member.isfile():
+                            continue
+                        package_id = len(packages)
+                        packages.append(directory.rsplit("-", 2)[0])
+                        for line in archive.extractfile(member).read().split(b"\n"):
+                            if line and not line.startswith(b"%") and not line.endswith(b"/"):
+                                entries.append((line, package_id))
+            except Exception:
+                continue
+        entries.sort()
+        paths = bytearray()
+        path_offsets = array("Q", [0])
+        path_packages = array("I")
+        package_counts = [0] * len(packages)
+        for path, package_id in entries:
+            paths += path
+            path_offsets.append(len(paths))
+            path_packages.append(package_id)
+            package_counts[package_id] += 1
+        basename_order = array("I", sorted(range(len(entries)),
+                                           key=lambda i: entries[i][0].rpartition(b"/")[2]))
+        package_starts = array("I", [0])
+        for count in package_counts:
+            package_starts.append(package_starts[-1] + count)
+        package_paths = array("I", sorted(range(len(entries)), key=path_packages.__getitem__))
+        sections = {}
+        tmp_file = self.index_file + ".tmp"
+        try:
+            os.makedirs(os.path.dirname(self.index_file), exist_ok=True)
+            with open(tmp_file, "wb") as f:
+                f.write(bytes(self.HEADER.size))
+                for name, data in (("path_offsets", path_offsets), ("path_packages", path_packages),
+                                   ("basename_order", basename_order), ("package_starts", package_starts),
+                                   ("package_paths", package_paths), ("paths", paths)):
+                    f.write(bytes(-f.tell() % 8))
+                    sections[name] = (f.tell(), len(data) * getattr(data, "itemsize", 1))
+                    f.write(data)
+                meta = json.dumps({"signature": signature, "packages": packages, "sections": sections}).encode()
+                meta_offset = f.tell()
+                f.write(meta)
+                f.seek(0)
+                f.write(self.HEADER.pack(self.MAGIC, self.VERSION, meta_offset, len(meta)))
+            os.replace(tmp_file, self.index_file)
+        except OSError:
+            return False
+        return True
+
+    def path(self, view, i):
+        mapped, arrays, base = view[:3]
+        offsets = arrays["path_offsets"]
+        return mapped[base + offsets[i]:base + offsets[i + 1]]
+
+    def basename(self, view, i):
+        return self.path(view, i).rpartition(b"/")[2]
+
+    def lower_bound(self, count, key, value):
+        low, high = 0, count
+        while low < high:
+            middle = (low + high) // 2
+            if key(middle) < value:
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+    def search(self, query):
+        view = self.view
+        if view is None:
+            return []
+        arrays, packages = view[1], view[3]
+        count = len(arrays["path_packages"])
+        query = query.strip()
+        if query.startswith("/") and not query.endswith("/"):
+            owners = self.owners(query)
+            if owners:
+                return [(query, owner) for owner in owners]
+        if "/" in query:
+            prefix = query.lstrip("/").encode()
+            key = lambda i: self.path(view, i)
+            ids = range(self.lower_bound(count, key, prefix), self.lower_bound(count, key, prefix + b"\xff"))
+        else:
+            prefix = query.encode()
+            order = arrays["basename_order"]
+            key = lambda i: self.basename(view, order[i])
+            start = self.lower_bound(count, key, prefix)
+            ids = [order[i] for i in range(start, self.lower_bound(count, key, prefix + b"\xff"))]
+        matches = []
+        seen = set()
+        for i in ids:
+            if len(matches) >= self.SEARCH_LIMIT:
+                break
+            match = ("/" + self.path(view, i).decode("utf-8", "replace"), packages[arrays["path_packages"][i]])
+            if match not in seen:
+                seen.add(match)
+                matches.append(match)
+        return matches
+
+    def owners(self, path):
+        view = self.view
+        if view is None:
+            return []
+        arrays, packages = view[1], view[3]
+        path = path.lstrip("/").encode()
+        count = len(arrays["path_packages"])
+        i = self.lower_bound(count, lambda i: self.path(view, i), path)
+        owners = []
+        while i < count and self.path(view, i) == path:
+            owner = packages[arrays["path_packages"][i]]
+            if owner not in owners:
+                owners.append(owner)
+            i += 1
+        return owners
+
+    def files(self, package_name):
+        view = self.view
+        if view is None or package_name not in view[4]:
+            return []
+        arrays = view[1]
+        package_id = view[4][package_name]
+        starts = arrays["package_starts"]
+        return ["/" + self.path(view, i).decode("utf-8", "replace")
+                for i in arrays["package_paths"][starts[package_id]:starts[package_id + 1]]]
+
+
+class UpdateChecker:
+    TEMP_DB = os.path.join(tempfile.gettempdir(), f"fkinstall-checkup-db-{os.getuid()}")
+
+    def __init__(self, installed_packages, sync_db, cache_dir="~/.cache/fkinstall/checkup"):
+        self.installed_packages = installed_packages
+        self.sync_db = sync_db
+        self.cache_dir = cache_dir
+        self.updates = []
+        self.checked = False
+        self.refreshed_db = None
+
+    def check(self, task, refresh=False):
+        if refresh:
+            sync_db = self.refresh_temp_db(task)
+            if sync_db is not None and sync_db.is_loaded():
+                self.refreshed_db = sync_db
+        sync_db = self.newest_db()
+        updates = []
+        for name, version in list(self.installed_packages.packages.items()):
+            record = sync_db.packages.get(name)
+            if record is not None and vercmp(record["version"], version) > 0:
+                updates.append({
+                    "name": name,
+                    "repo": record["repo"],
+                    "old_version": version,
+                    "new_version": record["version"],
+                    "download_size": record["csize"],
+                    "size_delta": record["isize"] - self.installed_packages.installed_size(name),
+                })
+        updates.sort(key=lambda update: update["name"])
+        return updates
+
+    def newest_db(self):
+        if self.refreshed_db is None or not self.sync_db.is_loaded():
+            return self.refreshed_db or self.sync_db
+
+        def mtime(sync_db):
+            return max((mtime for _, mtime in sync_db.signature(sync_db.db_files())), default=0)
+
+        return max((self.sync_db, self.refreshed_db), key=mtime)
+
+    def refresh_temp_db(self, task):
+        try:
+            os.makedirs(self.TEMP_DB, exist_ok=True)
+            local_link = os.path.join(self.TEMP_DB, "local")
+            if not os.path.lexists(local_link):
+                os.symlink(self.installed_packages.db_path, local_link)
+            returncode, _ = run_query_command(task, [
+                "fakeroot", "--", "pacman", "-Sy", "--dbpath", self.TEMP_DB, "--logfile", "/dev/null"
+            ])
+        except Exception:
+            return None
+        if returncode != 0 or task.cancelled:
+            return None
+        sync_db = SyncDatabase(os.path.join(self.TEMP_DB, "sync"), self.cache_dir, self.sync_db.pacman_conf)
+        sync_db.load()
+        return sync_db
+
+    def summary(self):
+        download = sum(update["download_size"] for update in self.updates)
+        delta = sum(update["size_delta"] for update in self.updates)
+        sign = "+" if delta >= 0 else "-"
+        return (f"{len(self.updates)} pending updates, download {format_size(download)}, "
+                f"installed size {sign}{format_size(abs(delta))}")
+
+    def details(self):
+        return "\n".join(f"{update['repo']}/{update['name']} {update['old_version']} -> {update['new_version']}"
+                         for update in self.updates)
+
+
+class MirrorRanker:
+    SERVER = re.compile(r"^\s*(#)?\s*Server\s*=\s*(\S+)")
+    PROBE_TIMEOUT = 5
+    CONCURRENCY = 16
+    PROBE_BYTES = 256 * 1024
+    THROUGHPUT_STEP = 100 * 1024
+    REPO = "core"
+    HEADER = "## Ranked by Fikus Store"
+
+    def __init__(self, mirrorlist="/etc/pacman.d/mirrorlist", cache_dir="~/.cache/fkinstall",
+                 timeout=PROBE_TIMEOUT, concurrency=CONCURRENCY):
+        self.mirrorlist = mirrorlist
+        self.cache_dir = os.path.expanduser(cache_dir)
+        self.timeout = timeout
+        self.concurrency = concurrency
+        self.arch = os.uname().machine
+
+    def servers(self, include_commented=False):
+        servers = []
+        with open(self.mirrorlist) as f:
+            for line in f:
+                match = self.SERVER.match(line)
+                if match and (include_commented or not match.group(1)) and match.group(2) not in servers:
+                    servers.append(match.group(2))
+        return servers
+
+    def probe_url(self, server):
+        return server.replace("$repo", self.REPO).replace("$arch", self.arch).rstrip("/") + f"/{self.REPO}.db"
+
+    def rank(self, task, servers):
+        loop = asyncio.new_event_loop()
+        semaphore = asyncio.Semaphore(self.concurrency)
+        pending = {loop.create_task(self.probe(semaphore, server)) for server in servers}
+        try:
+            while pending and not task.cancelled:
+                done, pending = loop.run_until_complete(
+                    asyncio.wait(pending, timeout=0.2, return_when=asyncio.FIRST_COMPLETED))
+                if done:
+                    yield [future.result() for future in done]
+        finally:
+            for future in pending:
+                future.cancel()
+            if pending:
+                loop.run_until_complete(asyncio.gather(*pending, return_exceptions=True))
+            loop.close()
+
+    async def probe(self, semaphore, server):
+        result = {"server": server, "connect": None, "throughput": None, "error": None}
+        async with semaphore:
+            try:
+                await asyncio.wait_for(self.fetch(self.probe_url(server), result), self.timeout)
+            except asyncio.TimeoutError:
+                result["error"] = "timed out"
+            except (OSError, ValueError) as e:
+                result["error"] = str(e) or type(e).__name__
+        return result
+
+    async def fetch(self, url, result):
+        parts = urllib.parse.urlsplit(url)
+        if parts.scheme not in ("http", "https"):
+            raise ValueError(f"unsupported scheme {parts.scheme}")
+        secure = parts.scheme == "https"
+        start = time.perf_counter()
+        reader, writer = await asyncio.open_connection(
+            parts.hostname, parts.port or (443 if secure else 80),
+            ssl=ssl.create_default_context() if secure else None)
+        try:
+            result["connect"] = time.perf_counter() - start
+            writer.write((f"GET {parts.path or '/'} HTTP/1.1\r\nHost: {parts.netloc}\r\n"
+                          f"Range: bytes=0-{self.PROBE_BYTES - 1}\r\nUser-Agent: fkinstall\r\n"
+                          f"Connection: close\r\n\r\n").encode())
+            await writer.drain()
+            status = (await reader.readline()).split()
+            if len(status) < 2 or status[1] not in (b"200", b"206"):
+                raise ValueError(f"HTTP {status[1].decode() if len(status) > 1 else 'error'}")
+            while (await reader.readline()).strip():
+                pass
+            body_start = time.perf_counter()
+            received = 0
+            while received < self.PROBE_BYTES:
+                chunk = await reader.read(65536)
+                if not chunk:
+                    break
+                received += len(chunk)
+            if not received:
+                raise ValueError("empty response")
+            result["throughput"] = received / max(time.perf_counter() - body_start, 0.001)
+        finally:
+            writer.close()
+
+    def sort(self, results):
+        return sorted(results, key=lambda result: (result["throughput"] is None,
+                                                   -int((result["throughput"] or 0) // self.THROUGHPUT_STEP),
+                                                   result["connect"] or 0))
+
+    def format_result(self, result):
+        if result["throughput"] is None:
+            return f"{result['server']}  ({result['error']})"
+        return (f"{result['server']}  ({format_size(result['throughput'])}/s, "
+                f"connect {result['connect'] * 1000:.0f} ms)")
+
+    def write_ranked(self, results, limit=0):
+        ranked = [result for result in self.sort(results) if result["throughput"] is not None]
+        if limit:
+            ranked = ranked[:limit]
+        probed = {result["server"] for result in results}
+        lines = [f"{self.HEADER} on {time.strftime('%Y-%m-%d %H:%M')}"]
+        lines.extend(f"Server = {result['server']}" for result in ranked)
+        lines.append("")
+        with open(self.mirrorlist) as f:
+            original = f.read().splitlines()
+        in_block = False
+        for line in original:
+            if line.startswith(self.HEADER):
+                in_block = True
+            if in_block:
+                in_block = bool(line.strip())
+                continue
+            match = self.SERVER.match(line)
+            if match and not match.group(1) and match.group(2) in probed:
+                line = "#" + line.lstrip()
+            lines.append(line)
+        os.makedirs(self.cache_dir, exist_ok=True)
+        path = os.path.join(self.cache_dir, "mirrorlist.ranked")
+        with open(path, "w") as f:
+            f.write("\n".join(lines) + "\n")
+        return path
+
+
+class DependencyGraph:
+    DEPENDENCY = re.compile(r"^([^<>=]+)(?:(<=|>=|<|>|=)(.+))?$")
+    REASON_DEPENDENCY = 1
+
+    def __init__(self, local_records, sync_packages, sync_provides):
+        self.local = local_records
+        self.sync = sync_packages
+        self.sync_provides = sync_provides
+        self.local_providers = {}
+        for name, record in local_records.items():
+            self.local_providers.setdefault(name, []).append(name)
+            for provided in record["provides"]:
+                self.local_providers.setdefault(self.parse(provided)[0], []).append(name)
+        self.requirements = {}
+        self.required_by = {}
+        self.optional_for = {}
+        for name, record in local_records.items():
+            requirements = []
+            for dependency in record["depends"]:
+                providers = set(self.local_candidates(self.parse(dependency)))
+                requirements.append(providers)
+                for provider in providers:
+                    self.required_by.setdefault(provider, set()).add(name)
+            self.requirements[name] = requirements
+            for dependency in record["optdepends"]:
+                for provider in self.local_candidates(self.parse(dependency)):
+                    self.optional_for.setdefault(provider, set()).add(name)
+
+    def parse(self, dependency):
+        match = self.DEPENDENCY.match(dependency.strip())
+        if not match:
+            return dependency, None, None
+        return match.group(1), match.group(2), match.group(3)
+
+    def version_matches(self, version, operator, wanted):
+        result = vercmp(version, wanted)
+        return {"=": result == 0, ">=": result >= 0, "<=": result <= 0, ">": result > 0, "<": result < 0}[operator]
+
+    def satisfies(self, dependency, record):
+        name, operator, wanted = dependency
+        if record["name"] == name:
+            if operator is None or self.version_matches(record["version"], operator, wanted):
+                return True
+        for provided in record["provides"]:
+            provided_name, _, provided_version = self.parse(provided)
+            if provided_name != name:
+                continue
+            if operator is None:
+                return True
+            if provided_version is not None and self.version_matches(provided_version, operator, wanted):
+                return True
+        return False
+
+    def local_candidates(self, dependency):
+        return [name for name in self.local_providers.get(dependency[0], ())
+                if self.satisfies(dependency, self.local[name])]
+
+    def sync_provider(self, dependency):
+        record = self.sync.get(dependency[0])
+        if record is not None and self.satisfies(dependency, record):
+            return record
+        for name in self.sync_provides.get(dependency[0], ()):
+            if self.satisfies(dependency, self.sync[name]):
+                return self.sync[name]
+        return None
+
+    def install_plan(self, package_names):
+        planned = {}
+        missing = []
+        pending = list(package_names)
+        while pending:
+            name = pending.pop(0)
+            record = self.sync_provider((name, None, None))
+            if record is None:
+                missing.append(name)
+                continue
+            if record["name"] in planned:
+                continue
+            planned[record["name"]] = record
+            for dependency in record["depends"]:
+                dependency = self.parse(dependency)
+                if self.local_candidates(dependency):
+                    continue
+                if any(self.satisfies(dependency, other) for other in planned.values()):
+                    continue
+                provider = self.sync_provider(dependency)
+                if provider is None:
+                    missing.append("".join(part for part in dependency if part))
+                else:
+                    pending.append(provider["name"])
+        conflicts = set()
+        replaces = set()
+        for record in planned.values():
+            for conflict in record["conflicts"]:
+                conflicts.update(name for name in self.local_candidates(self.parse(conflict))
+                                 if name != record["name"])
+            for replaced in record["replaces"]:
+                replaces.update(name for name in self.local_candidates(self.parse(replaced))
+                                if name != record["name"])
+        return {
+            "packages": [record["name"] for record in planned.values()],
+            "dependencies": [name for name in planned if name not in package_names],
+            "missing": missing,
+            "conflicts": sorted(conflicts),
+            "replaces": sorted(replaces),
+            "download_size": sum(record["csize"] for record in planned.values()),
+            "installed_size": sum(record["isize"] for record in planned.values()),
+        }
+
+    def removal_impact(self, package_names):
+        removing = {name for name in package_names if name in self.local}
+        breaks = set()
+        for name in removing:
+            for dependent in self.required_by.get(name, ()):
+                if dependent in removing:
+                    continue
+                if any(name in providers and not providers - removing
+                       for providers in self.requirements[dependent]):
+                    breaks.add(dependent)
+        orphans = set()
+        candidates = set()
+        for name in removing:
+            for providers in self.requirements[name]:
+                candidates.update(providers)
+        while candidates:
+            candidate = candidates.pop()
+            if candidate in removing or candidate in orphans:
+                continue
+            if self.local[candidate]["reason"] != self.REASON_DEPENDENCY:
+                continue
+            if self.required_by.get(candidate, set()) - removing - orphans:
+                continue
+            orphans.add(candidate)
+            for providers in self.requirements[candidate]:
+                candidates.update(providers)
+        return {
+            "packages": sorted(removing),
+            "breaks": sorted(breaks),
+            "orphans": sorted(orphans),
+            "freed_size": sum(self.local[name]["isize"] for name in removing | orphans),
+        }
+
+    def orphans(self):
+        orphans = set()
+        changed = True
+        while changed:
+            changed = False
+            for name, record in self.local.items():
+                if name in orphans or record["reason"] != self.REASON_DEPENDENCY:
+                    continue
+                if self.optional_for.get(name, set()) - {name}:
+                    continue
+                if self.required_by.get(name, set()) - orphans - {name}:
+                    continue
+                orphans.add(name)
+                changed = True
+        return sorted(orphans)
+
+    def orphan_selection(self, selected, name, checked):
+        selected = set(selected)
+        if checked:
+            pending = [name]
+            while pending:
+                for requirer in self.required_by.get(pending.pop(), ()):
+                    if requirer not in selected:
+                        selected.add(requirer)
+                        pending.append(requirer)
+        changed = True
+        while changed:
+            changed = False
+            for orphan in list(selected):
+                if self.required_by.get(orphan, set()) - selected - {orphan}:
+                    selected.discard(orphan)
+                    changed = True
+        return selected
+
+    def describe_install(self, plan):
+        lines = [f"Installs {len(plan['packages'])} package(s): download {format_size(plan['download_size'])}, "
+                 f"installed size {format_size(plan['installed_size'])}"]
+        if plan["dependencies"]:
+            lines.append(f"Dependencies: {', '.join(plan['dependencies'])}")
+        if plan["conflicts"]:
+            lines.append(f"Conflicts with installed: {', '.join(plan['conflicts'])}")
+        if plan["replaces"]:
+            lines.append(f"Replaces: {', '.join(plan['replaces'])}")
+        if plan["missing"]:
+            lines.append(f"Not found in the sync databases: {', '.join(plan['missing'])}")
+        return "\n".join(lines)
+
+    def describe_removal(self, impact):
+        lines = [f"Removes {len(impact['packages'])} package(s), frees {format_size(impact['freed_size'])}"]
+        if impact["breaks"]:
+            lines.append(f"Required by: {', '.join(impact['breaks'])}")
+        if impact["orphans"]:
+            lines.append(f"Leaves orphaned: {', '.join(impact['orphans'])}")
+        return "\n".join(lines)
+
+
+class PackageDetailsCache:
+    TTL = 600
+    NO_INFO = "No information available."
+
+    def __init__(self, sync_db, aur_index, ttl=TTL):
+        self.sync_db = sync_db
+        self.aur_index = aur_index
+        self.ttl = ttl
+        self.entries = {}
+        self.signature = None
+
+    def validate(self):
+        signature = self.sync_db.signature(self.sync_db.db_files())
+        if signature != self.signature:
+            self.entries.clear()
+            self.signature = signature
+
+    def get(self, name):
+        record = self.sync_db.info(name)
+        if record is not None:
+            return self.sync_db.format_info(record)
+        record = self.aur_index.info(name)
+        if record is not None:
+            return self.aur_index.format_info(record)
+        entry = self.entries.get(name)
+        if entry is None:
+            return None
+        if time.monotonic() - entry[0] > self.ttl:
+            del self.entries[name]
+            return None
+        return entry[1]
+
+    def needs_fetch(self, name, use_yay):
+        if self.get(name) is not None:
+            return False
+        return use_yay or not self.sync_db.is_loaded()
+
+    def put(self, details):
+        now = time.monotonic()
+        for name, text in details.items():
+            self.entries[name] = (now, text)
+
+    def fetch(self, task, names, command):
+        try:
+            _, stdout = run_query_command(task, command + names)
+        except Exception:
+            stdout = ""
+        found = {}
+        for block in stdout.split("\n\n"):
+            for line in block.splitlines():
+                key, _, value = line.partition(":")
+                if key.strip() == "Name":
+                    found[value.strip()] = block.strip()
+                    break
+        return {name: found.get(name, self.NO_INFO) for name in names}
+
+
+class StringColumn:
+    def __init__(self, values=()):
+        self.data = bytearray()
+        self.offsets = array("I", [0])
+        for value in values:
+            self.append(value)
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i):
+        return self.data[self.offsets[i]:self.offsets[i + 1]].decode("utf-8")
+
+    def __iter__(self):
+        return (self[i] for i in range(len(self)))
+
+    def append(self, value):
+        self.data += value.encode("utf-8")
+        self.offsets.append(len(self.data))
+
+
+class SortedView:
+    def __init__(self, column, order):
+        self.column = column
+        self.order = order
+
+    def __len__(self):
+        return len(self.order)
+
+    def __getitem__(self, j):
+        return self.column[self.order[j]]
+
+    def find(self, value):
+        j = bisect.bisect_left(self, value)
+        return self.order[j] if j < len(self.order) and self[j] == value else None
+
+
+class SearchIndex:
+    def __init__(self, records=(), compact=False):
+        self.build(records, compact)
+
+    def build(self, records, compact):
+        column = StringColumn if compact else list
+        entries = sorted(((record["name"].lower(), record["name"], record["description"].lower())
+                          for record in records), key=lambda entry: (len(entry[0]), entry[0]))
+        self.keys = column(entry[0] for entry in entries)
+        self.names = column(entry[1] for entry in entries)
+        self.descriptions = column(entry[2] for entry in entries)
+        order = sorted(range(len(entries)), key=lambda i: entries[i][0])
+        self.sorted_keys = SortedView(self.keys, array("I", order))
+        self.name_trigrams = self.build_trigrams((entry[0] for entry in entries), compact)
+        self.description_trigrams = self.build_trigrams((entry[2] for entry in entries), compact)
+
+    def build_trigrams(self, texts, compact):
+        trigrams = {}
+        for i, text in enumerate(texts):
+            for trigram in {text[j:j + 3] for j in range(len(text) - 2)}:
+                posting = trigrams.get(trigram)
+                if posting is None:
+                    trigrams[trigram] = posting = array("I")
+                posting.append(i)
+        return trigrams if compact else {trigram: set(posting) for trigram, posting in trigrams.items()}
+
+    def candidates(self, trigrams, term):
+        postings = []
+        for trigram in {term[j:j + 3] for j in range(len(term) - 2)}:
+            posting = trigrams.get(trigram)
+            if not posting:
+                return set()
+            postings.append(posting)
+        postings.sort(key=len)
+        return set(postings[0]).intersection(*postings[1:])
+
+    def prefix_matches(self, prefix):
+        start = bisect.bisect_left(self.sorted_keys, prefix)
+        end = bisect.bisect_left(self.sorted_keys, prefix + "\uffff", start)
+        return self.sorted_keys.order[start:end]
+
+    def term_matches(self, term):
+        ids = self.candidates(self.name_trigrams, term)
+        if len(term) > 3:
+            ids = {i for i in ids if term in self.keys[i]}
+        description_ids = self.candidates(self.description_trigrams, term)
+        if len(term) > 3:
+            description_ids = {i for i in description_ids if term in self.descriptions[i]}
+        return ids | description_ids
+
+    def search(self, query, limit=None):
+        query = query.strip().lower()
+        terms = query.split()
+        if not terms:
+            return []
+        ranked = []
+        seen = set()
+
+        def full():
+            return limit is not None and len(ranked) >= limit
+
+        def add(ids, key=None):
+            ids = sorted(ids, key=key) if limit is None else heapq.nsmallest(limit + len(seen), ids, key=key)
+            for i in ids:
+                if full():
+                    return
+                if i not in seen:
+                    seen.add(i)
+                    ranked.append(i)
+
+        def tier(i):
+            key = self.keys[i]
+            if all(term in key for term in terms):
+                return 0 if key.startswith(terms[0]) else 1, i
+            return 2 if any(term in key for term in terms) else 3, i
+
+        if len(terms) == 1:
+            exact = self.sorted_keys.find(query)
+            if exact is not None:
+                add([exact])
+            add(self.prefix_matches(query))
+            if len(query) >= 3 and not full():
+                ids = self.candidates(self.name_trigrams, query)
+                add(i for i in ids if query in self.keys[i])
+        long_terms = [term for term in terms if len(term) >= 3]
+        matches = None
+        if full():
+            pass
+        elif long_terms:
+            for term in sorted(long_terms, key=len, reverse=True):
+                ids = self.term_matches(term)
+                matches = ids if matches is None else matches & ids
+                if not matches:
+                    break
+        elif len(terms) > 1:
+            matches = set()
+            for term in terms:
+                matches.update(self.prefix_matches(term))
+            for joined in {"".join(terms), "-".join(terms)}:
+                if len(joined) >= 3:
+                    matches |= self.candidates(self.name_trigrams, joined)
+        short_terms = [term for term in terms if len(term) < 3]
+        if matches and short_terms:
+            matches = {i for i in matches - seen
+                       if all(term in self.keys[i] or term in self.descriptions[i] for term in short_terms)}
+        if matches:
+            add(matches - seen, key=tier if len(terms) > 1 else None)
+        if limit is not None:
+            ranked = ranked[:limit]
+        return [self.names[i] for i in ranked]
+
+
+JSON_SEPARATOR = re.compile(r"[\s,\[\]]*")
+
+
+def iter_json_array(stream, chunk_size=1 << 16):
+    decoder = json.JSONDecoder()
+    buffer = ""
+    while True:
+        chunk = stream.read(chunk_size)
+        buffer += chunk
+        position = 0
+        while True:
+            position = JSON_SEPARATOR.match(buffer, position).end()
+            if position >= len(buffer):
+                break
+            try:
+                value, position = decoder.raw_decode(buffer, position)
+            except ValueError:
+                if not chunk:
+                    raise
+                break
+            yield value
+        buffer = buffer[position:]
+        if not chunk:
+            return
+
+
+class AurIndex:
+    URL = "https://aur.archlinux.org/packages-meta-ext-v1.json.gz"
+    CACHE_VERSION = 2
+    REFRESH_INTERVAL = 24 * 60 * 60
+    DOWNLOAD_TIMEOUT = 60
+    FIELDS = {
+        "name": "Name", "version": "Version", "description": "Description", "url": "URL",
+        "maintainer": "Maintainer", "votes": "NumVotes", "popularity": "Popularity",
+        "out_of_date": "OutOfDate", "licenses": "License", "depends": "Depends", "provides": "Provides",
+    }
+    LIST_FIELDS = ("licenses", "depends", "provides")
+    NUMBER_FIELDS = {"votes": "I", "popularity": "d", "out_of_date": "q"}
+
+    def __init__(self, source=URL, cache_dir="~/.cache/fkinstall"):
+        cache_dir = os.path.expanduser(cache_dir)
+        self.source = source
+        self.dump_file = os.path.join(cache_dir, "packages-meta-ext-v1.json.gz")
+        self.cache_file = os.path.join(cache_dir, "aur.pickle")
+        self.columns = {}
+        self.by_name = None
+        self.search_index = None
+
+    def is_remote(self):
+        return "://" in self.source
+
+    def dump_path(self):
+        return self.dump_file if self.is_remote() else self.source
+
+    def is_stale(self):
+        try:
+            return time.time() - os.stat(self.dump_path()).st_mtime > self.REFRESH_INTERVAL
+        except OSError:
+            return True
+
+    def is_loaded(self):
+        return self.search_index is not None
+
+    def refresh(self, task, force=False):
+        if self.is_remote() and (force or self.is_stale()):
+            self.download(task)
+        if not task.cancelled:
+            self.load(task)
+
+    def download(self, task):
+        request = urllib.request.Request(self.source)
+        if os.path.exists(self.dump_file):
+            request.add_header("If-Modified-Since",
+                               email.utils.formatdate(os.stat(self.dump_file).st_mtime, usegmt=True))
+        tmp_file = self.dump_file + ".tmp"
+        try:
+            os.makedirs(os.path.dirname(self.dump_file), exist_ok=True)
+            with urllib.request.urlopen(request, timeout=self.DOWNLOAD_TIMEOUT) as response, \
+                    open(tmp_file, "wb") as f:
+                while not task.cancelled:
+                    data = response.read(1 << 16)
+                    if not data:
+                        break
+                    f.write(data)
+            if task.cancelled:
+                os.remove(tmp_file)
+                return
+            os.replace(tmp_file, self.dump_file)
+        except urllib.error.HTTPError as e:
+            if e.code == 304:
+                os.utime(self.dump_file)
+        except (OSError, urllib.error.URLError):
+            pass
+
+    def signature(self):
+        try:
+            stat = os.stat(self.dump_path())
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def load(self, task):
+        signature = self.signature()
+        if signature is None:
+            return
+        data = self.load_cache(signature)
+        if data is None:
+            columns = self.ingest(task)
+            if columns is None:
+                return
+            records = ({"name": name, "description": description}
+                       for name, description in zip(columns["name"], columns["description"]))
+            names = columns["name"]
+            data = {"columns": columns, "search_index": SearchIndex(records, compact=True),
+                    "by_name": SortedView(names, array("I", sorted(range(len(names)), key=names.__getitem__)))}
+            self.save_cache(signature, data)
+        self.columns = data["columns"]
+        self.by_name = data["by_name"]
+        self.search_index = data["search_index"]
+
+    def ingest(self, task):
+        columns = {column: array(self.NUMBER_FIELDS[column]) if column in self.NUMBER_FIELDS else StringColumn()
+                   for column in self.FIELDS}
+        try:
+            with gzip.open(self.dump_path(), "rt", encoding="utf-8") as f:
+                for count, package in enumerate(iter_json_array(f)):
+                    if count % 1000 == 0 and task.cancelled:
+                        return None
+                    for column, key in self.FIELDS.items():
+                        value = package.get(key)
+                        if column in self.LIST_FIELDS:
+                            value = "\n".join(str(item) for item in value or ())
+                        elif column in self.NUMBER_FIELDS:
+                            value = value or 0
+                        elif value is None:
+                            value = ""
+                        columns[column].append(value)
+        except (OSError, ValueError, EOFError):
+            return None
+        return columns
+
+    def load_cache(self, signature):
+        gc.disable()
+        try:
+            with open(self.cache_file, "rb") as f:
+                data = pickle.load(f)
+        except Exception:
+            return None
+        finally:
+            gc.enable()
+        if data.get("version") != self.CACHE_VERSION or data.get("signature") != signature:
+            return None
+        return data
+
+    def save_cache(self, signature, data):
+        try:
+            os.makedirs(os.path.dirname(self.cache_file), exist_ok=True)
+            tmp_file = self.cache_file + ".tmp"
+            with open(tmp_file, "wb") as f:
+                pickle.dump(dict(data, version=self.CACHE_VERSION, signature=signature),
+                            f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_file, self.cache_file)
+        except OSError:
+            pass
+
+    def info(self, package_name):
+        i = self.by_name.find(package_name) if self.by_name is not None else None
+        if i is None:
+            return None
+        record = {column: values[i] for column, values in self.columns.items()}
+        for column in self.LIST_FIELDS:
+            record[column] = tuple(record[column].split("\n")) if record[column] else ()
+        record["out_of_date"] = record["out_of_date"] or None
+        return record
+
+    def format_info(self, record):
+        out_of_date = record["out_of_date"]
+        lines = [
+            "Repository: aur",
+            f"Name: {record['name']}",
+            f"Version: {record['version']}",
+            f"Description: {record['description']}",
+            f"URL: {record['url']}",
+            f"Licenses: {'  '.join(record['licenses']) or 'None'}",
+            f"Provides: {'  '.join(record['provides']) or 'None'}",
+            f"Depends On: {'  '.join(record['depends']) or 'None'}",
+            f"Maintainer: {record['maintainer'] or 'None'}",
+            f"Votes: {record['votes'] or 0}",
+            f"Popularity: {record['popularity'] or 0:.2f}",
+            f"Out Of Date: {time.strftime('%Y-%m-%d', time.localtime(out_of_date)) if out_of_date else 'No'}",
+        ]
+        return "\n".join(lines)
 
 
 class PackageInfoDialog(QDialog):
@@ -66,166 +2373,989 @@ class PackageInfoDialog(QDialog):
         self.package_name = package_name
         self.parent = parent
         self.init_ui()
+        PROFILER.count("widgets", 1 + len(self.findChildren(QWidget)))
 
     def init_ui(self):
         self.setWindowTitle(f"Package Info: {self.package_name}")
-        self.setFixedSize(400, 300)
+        self.setFixedSize(400, 360)
         layout = QVBoxLayout()
         self.icon_label = QLabel()
-        self.icon_label.setPixmap(self.get_package_icon(self.package_name).pixmap(64, 64))
+        self.icon_label.setPixmap(self.parent.icons.pixmap(self.package_name))
+        self.parent.icons.icons_ready.connect(self.on_icons_ready)
         self.icon_label.setAlignment(Qt.AlignCenter)
         layout.addWidget(self.icon_label)
-        self.info_label = QLabel(self.get_package_info(self.package_name))
+        self.info_label = QLabel("Loading package information...")
         self.info_label.setWordWrap(True)
         layout.addWidget(self.info_label)
+        self.dependency_label = QLabel()
+        self.dependency_label.setWordWrap(True)
+        layout.addWidget(self.dependency_label)
+        self.file_list = QListWidget()
+        self.file_list.setObjectName("files")
+        self.file_list.setVisible(False)
+        layout.addWidget(self.file_list)
         self.button_box = QDialogButtonBox()
-        self.install_button = self.button_box.addButton("Install", QDialogButtonBox.ActionRole)
-        self.remove_button = self.button_box.addButton("Remove", QDialogButtonBox.ActionRole)
+        self.action_button = self.button_box.addButton("Install", QDialogButtonBox.ActionRole)
+        self.action_button.setProperty("installed", False)
+        self.files_button = self.button_box.addButton("Files", QDialogButtonBox.ActionRole)
         self.close_button = self.button_box.addButton("Close", QDialogButtonBox.RejectRole)
-        self.install_button.clicked.connect(self.install_package)
-        self.remove_button.clicked.connect(self.remove_package)
+        self.action_button.clicked.connect(self.toggle_package)
+        self.files_button.clicked.connect(self.toggle_files)
         self.close_button.clicked.connect(self.close)
         layout.addWidget(self.button_box)
         self.setLayout(layout)
         self.update_button_state()
+        self.finished.connect(self.on_finished)
+        self.load_package_info()
+        self.parent.queries.submit("impact", self.parent.query_package_impact, self.package_name,
+                                   on_chunk=self.dependency_label.setText)
+
+    def on_finished(self):
+        self.parent.queries.cancel("info")
+        self.parent.queries.cancel("impact")
+        self.parent.queries.cancel("package-files")
+        self.parent.icons.icons_ready.disconnect(self.on_icons_ready)
+
+    def on_icons_ready(self, names):
+        if self.package_name in names:
+            self.icon_label.setPixmap(self.parent.icons.pixmap(self.package_name))
+
+    def load_package_info(self):
+        details = self.parent.details
+        details.validate()
+        if details.needs_fetch(self.package_name, self.parent.package_manager_switch.isChecked()):
+            self.parent.queries.submit("info", self.parent.query_details, [self.package_name],
+                                       on_chunk=self.on_package_info)
+        else:
+            self.info_label.setText(details.get(self.package_name) or details.NO_INFO)
+
+    def on_package_info(self, package_details):
+        self.parent.details.put(package_details)
+        self.info_label.setText(package_details[self.package_name])
+
+    def is_package_installed(self):
+        return self.parent.installed_packages.is_installed(self.package_name)
+
+    def update_button_state(self):
+        installed = self.is_package_installed()
+        if self.action_button.property("installed") == installed:
+            return
+        self.action_button.setText("Remove" if installed else "Install")
+        self.action_button.setProperty("installed", installed)
+        self.action_button.style().unpolish(self.action_button)
+        self.action_button.style().polish(self.action_button)
+
+    def toggle_package(self):
+        if self.is_package_installed():
+            self.parent.remove_selected_package(self.package_name)
+        else:
+            self.parent.install_selected_package(self.package_name)
+        self.update_button_state()
+
+    def toggle_files(self):
+        if self.file_list.isVisible():
+            self.file_list.setVisible(False)
+            self.setFixedSize(400, 360)
+            return
+        self.file_list.setVisible(True)
+        self.setFixedSize(400, 620)
+        if self.file_list.count() == 0:
+            self.file_list.addItem("Loading file list...")
+            self.parent.queries.submit("package-files", self.parent.query_package_files, self.package_name,
+                                       on_chunk=self.on_package_files)
+
+    def on_package_files(self, files):
+        self.file_list.clear()
+        if files is None:
+            self.file_list.addItem("File databases not found. Run 'pacman -Fy' to download them.")
+        elif not files:
+            self.file_list.addItem("No files listed for this package.")
+        else:
+            self.file_list.addItems(files)
 
-    def get_package_icon(self, package_name):
-        icon = QIcon.fromTheme(package_name)
-        if icon.isNull():
-            icon = QIcon.fromTheme("applications-other")
-        return icon
 
-    def get_package_info(self, package_name):
+class MaintenanceDialog(QDialog):
+    def __init__(self, parent):
+        super().__init__(parent)
+        self.parent = parent
+        self.packages = []
+        self.plan = []
+        self.graph = None
+        self.init_ui()
+        self.scan()
+
+    def init_ui(self):
+        self.setWindowTitle("Maintenance")
+        self.resize(600, 520)
+        layout = QVBoxLayout()
+        self.cache_label = QLabel("Scanning package cache...")
+        self.cache_label.setWordWrap(True)
+        layout.addWidget(self.cache_label)
+        keep_layout = QHBoxLayout()
+        keep_layout.addWidget(QLabel("Cached versions to keep per package:"))
+        self.keep_spin = QSpinBox()
+        self.keep_spin.setRange(0, 10)
+        self.keep_spin.setValue(PackageCache.DEFAULT_KEEP)
+        self.keep_spin.valueChanged.connect(self.update_plan)
+        keep_layout.addWidget(self.keep_spin)
+        layout.addLayout(keep_layout)
+        self.plan_list = QListWidget()
+        layout.addWidget(self.plan_list)
+        self.orphan_label = QLabel("Looking for orphaned packages...")
+        layout.addWidget(self.orphan_label)
+        self.orphan_list = QListWidget()
+        self.orphan_list.itemChanged.connect(self.on_orphan_changed)
+        layout.addWidget(self.orphan_list)
+        self.button_box = QDialogButtonBox()
+        self.cleanup_button = self.button_box.addButton("Clean up", QDialogButtonBox.ActionRole)
+        self.cleanup_button.setProperty("danger", True)
+        self.cleanup_button.setEnabled(False)
+        self.close_button = self.button_box.addButton("Close", QDialogButtonBox.RejectRole)
+        self.cleanup_button.clicked.connect(self.clean_up)
+        self.close_button.clicked.connect(self.close)
+        layout.addWidget(self.button_box)
+        self.setLayout(layout)
+        self.finished.connect(self.on_finished)
+
+    def scan(self):
+        self.parent.queries.submit("maintenance", self.parent.query_package_cache, on_chunk=self.on_cache_scanned)
+        graph = self.graph = self.parent.get_dependency_graph()
+        orphans = graph.orphans()
+        self.orphan_list.blockSignals(True)
+        self.orphan_list.clear()
+        for name in orphans:
+            item = QListWidgetItem(f"{name}  ({format_size(graph.local[name]['isize'])})")
+            item.setData(Qt.UserRole, name)
+            item.setFlags(item.flags() | Qt.ItemIsUserCheckable)
+            item.setCheckState(Qt.Checked)
+            self.orphan_list.addItem(item)
+        self.orphan_list.blockSignals(False)
+        self.orphan_label.setText(f"Orphaned packages: {len(orphans)}, "
+                                  f"{format_size(sum(graph.local[name]['isize'] for name in orphans))}")
+        self.update_cleanup_button()
+
+    def on_cache_scanned(self, packages):
+        self.packages = packages
+        self.update_plan()
+
+    def update_plan(self):
+        self.plan = self.parent.package_cache.plan(self.packages, self.keep_spin.value())
+        self.plan_list.clear()
+        self.plan_list.addItems(os.path.basename(package["path"]) for package in self.plan)
+        self.cache_label.setText(
+            f"Package cache: {len(self.packages)} packages, "
+            f"{format_size(sum(package['size'] for package in self.packages))}. "
+            f"Removing {len(self.plan)} old versions frees {format_size(sum(package['size'] for package in self.plan))}."
+        )
+        self.update_cleanup_button()
+
+    def selected_orphans(self):
+        return [self.orphan_list.item(i).data(Qt.UserRole) for i in range(self.orphan_list.count())
+                if self.orphan_list.item(i).checkState() == Qt.Checked]
+
+    def on_orphan_changed(self, item):
+        selected = self.graph.orphan_selection(self.selected_orphans(), item.data(Qt.UserRole),
+                                               item.checkState() == Qt.Checked)
+        self.orphan_list.blockSignals(True)
+        for i in range(self.orphan_list.count()):
+            other = self.orphan_list.item(i)
+            other.setCheckState(Qt.Checked if other.data(Qt.UserRole) in selected else Qt.Unchecked)
+        self.orphan_list.blockSignals(False)
+
+    def update_cleanup_button(self):
+        self.cleanup_button.setEnabled(bool(self.plan) or self.orphan_list.count() > 0)
+
+    def clean_up(self):
+        orphans = self.selected_orphans()
+        files = self.parent.package_cache.plan_files(self.plan)
+        if not orphans and not files:
+            return
+        self.parent.clean_up(orphans, files)
+        self.close()
+
+    def on_finished(self):
+        self.parent.queries.cancel("maintenance")
+
+
+class MirrorDialog(QDialog):
+    def __init__(self, parent):
+        super().__init__(parent)
+        self.parent = parent
+        self.ranker = MirrorRanker()
+        self.results = []
+        self.init_ui()
+
+    def init_ui(self):
+        self.setWindowTitle("Mirrors")
+        self.resize(700, 520)
+        layout = QVBoxLayout()
+        self.status_label = QLabel(f"Rank the servers in {self.ranker.mirrorlist} by measured download speed.")
+        self.status_label.setWordWrap(True)
+        layout.addWidget(self.status_label)
+        options_layout = QHBoxLayout()
+        options_layout.addWidget(QLabel("Timeout (s):"))
+        self.timeout_spin = QSpinBox()
+        self.timeout_spin.setRange(1, 60)
+        self.timeout_spin.setValue(MirrorRanker.PROBE_TIMEOUT)
+        options_layout.addWidget(self.timeout_spin)
+        options_layout.addWidget(QLabel("Concurrent probes:"))
+        self.concurrency_spin = QSpinBox()
+        self.concurrency_spin.setRange(1, 128)
+        self.concurrency_spin.setValue(MirrorRanker.CONCURRENCY)
+        options_layout.addWidget(self.concurrency_spin)
+        layout.addLayout(options_layout)
+        selection_layout = QHBoxLayout()
+        self.commented_checkbox = QCheckBox("Also probe commented-out servers")
+        selection_layout.addWidget(self.commented_checkbox)
+        selection_layout.addWidget(QLabel("Servers to enable (0 = all):"))
+        self.limit_spin = QSpinBox()
+        self.limit_spin.setRange(0, 100)
+        selection_layout.addWidget(self.limit_spin)
+        layout.addLayout(selection_layout)
+        self.result_list = QListWidget()
+        layout.addWidget(self.result_list)
+        self.button_box = QDialogButtonBox()
+        self.rank_button = self.button_box.addButton("Rank", QDialogButtonBox.ActionRole)
+        self.write_button = self.button_box.addButton("Write mirrorlist", QDialogButtonBox.ActionRole)
+        self.write_button.setEnabled(False)
+        self.close_button = self.button_box.addButton("Close", QDialogButtonBox.RejectRole)
+        self.rank_button.clicked.connect(self.rank)
+        self.write_button.clicked.connect(self.write_mirrorlist)
+        self.close_button.clicked.connect(self.close)
+        layout.addWidget(self.button_box)
+        self.setLayout(layout)
+        self.finished.connect(self.on_finished)
+
+    def rank(self):
+        self.ranker.timeout = self.timeout_spin.value()
+        self.ranker.concurrency = self.concurrency_spin.value()
+        try:
+            servers = self.ranker.servers(self.commented_checkbox.isChecked())
+        except OSError as e:
+            QMessageBox.critical(self, "Error", f"Error reading mirrorlist: {e}")
+            return
+        if not servers:
+            self.status_label.setText(f"No servers found in {self.ranker.mirrorlist}.")
+            return
+        self.servers = servers
+        self.results = []
+        self.result_list.clear()
+        self.rank_button.setEnabled(False)
+        self.write_button.setEnabled(False)
+        self.status_label.setText(f"Probing {len(servers)} mirrors...")
+        self.parent.queries.submit("mirrors", self.parent.query_mirror_ranking, self.ranker, servers,
+                                   on_chunk=self.on_results, on_finished=self.on_ranked,
+                                   on_error=self.on_rank_error)
+
+    def on_results(self, results):
+        self.results.extend(results)
+        self.results = self.ranker.sort(self.results)
+        self.result_list.clear()
+        self.result_list.addItems(f"{i}. {self.ranker.format_result(result)}"
+                                  for i, result in enumerate(self.results, 1))
+        self.status_label.setText(f"Probed {len(self.results)} of {len(self.servers)} mirrors...")
+
+    def on_ranked(self):
+        reachable = [result for result in self.results if result["throughput"] is not None]
+        self.status_label.setText(f"{len(reachable)} of {len(self.results)} mirrors reachable.")
+        self.rank_button.setEnabled(True)
+        self.write_button.setEnabled(bool(reachable))
+
+    def on_rank_error(self, error):
+        self.status_label.setText(f"Error ranking mirrors: {error}")
+        self.rank_button.setEnabled(True)
+
+    def write_mirrorlist(self):
+        try:
+            path = self.ranker.write_ranked(self.results, self.limit_spin.value())
+        except OSError as e:
+            QMessageBox.critical(self, "Error", f"Error writing mirrorlist: {e}")
+            return
+        self.parent.write_mirrorlist(path, self.ranker.mirrorlist)
+        self.close()
+
+    def on_finished(self):
+        self.parent.queries.cancel("mirrors")
+
+
+class LocalImportDialog(QDialog):
+    def __init__(self, parent, directory):
+        super().__init__(parent)
+        self.parent = parent
+        self.directory = directory
+        self.repository = LocalRepository(directory)
+        self.errors = []
+        self.init_ui()
+        self.scan()
+
+    def init_ui(self):
+        self.setWindowTitle(f"Import Local Packages: {self.directory}")
+        self.resize(960, 640)
+        layout = QVBoxLayout()
+        self.status_label = QLabel(f"Reading packages in {self.directory}...")
+        self.status_label.setWordWrap(True)
+        layout.addWidget(self.status_label)
+        self.package_model = LocalPackageModel(self.parent, self.repository)
+        self.package_view = QListView()
+        self.delegate = LocalPackageDelegate(self.package_view)
+        self.package_view.setModel(self.package_model)
+        self.package_view.setItemDelegate(self.delegate)
+        self.package_view.setViewMode(QListView.IconMode)
+        self.package_view.setResizeMode(QListView.Adjust)
+        self.package_view.setMovement(QListView.Static)
+        self.package_view.setUniformItemSizes(True)
+        self.package_view.setGridSize(PackageDelegate.CARD_SIZE)
+        self.package_view.setMouseTracking(True)
+        self.package_view.setObjectName("packages")
+        self.delegate.toggle_requested.connect(self.toggle_package)
+        layout.addWidget(self.package_view)
+        self.error_list = QListWidget()
+        self.error_list.setMaximumHeight(100)
+        self.error_list.setVisible(False)
+        layout.addWidget(self.error_list)
+        self.button_box = QDialogButtonBox()
+        self.install_button = self.button_box.addButton("Install selected", QDialogButtonBox.ActionRole)
+        self.install_button.setEnabled(False)
+        self.close_button = self.button_box.addButton("Close", QDialogButtonBox.RejectRole)
+        self.install_button.clicked.connect(self.install)
+        self.close_button.clicked.connect(self.close)
+        layout.addWidget(self.button_box)
+        self.setLayout(layout)
+        self.parent.icons.icons_ready.connect(self.on_icons_ready)
+        self.finished.connect(self.on_finished)
+
+    def scan(self):
+        self.parent.queries.submit("local-import", self.parent.query_local_repository, self.repository,
+                                   on_chunk=self.on_packages_read, on_finished=self.on_scan_finished,
+                                   on_error=self.on_scan_error)
+
+    def on_packages_read(self, packages):
+        errors = [package for package in packages if "error" in package]
+        if errors:
+            self.errors.extend(errors)
+            self.error_list.addItems(f"{os.path.basename(package['path'])}: {package['error']}" for package in errors)
+            self.error_list.setVisible(True)
+        packages = [package for package in packages if "error" not in package]
+        if packages:
+            self.package_model.append_packages(packages)
+        self.update_status()
+
+    def on_scan_finished(self):
+        if not self.package_model.packages and not self.errors:
+            self.status_label.setText(f"No package archives found in {self.directory}.")
+            return
+        self.update_status()
+
+    def on_scan_error(self, error):
+        self.status_label.setText(f"Error reading packages: {error}")
+
+    def update_status(self):
+        scanning = "local-import" in self.parent.queries.tasks
+        prefix = f"Reading packages in {self.directory}... " if scanning else ""
+        counts = self.package_model.counts()
+        selected = self.package_model.selected_packages()
+        self.status_label.setText(
+            f"{prefix}{len(self.package_model.packages)} packages: {counts.get('new', 0)} new, "
+            f"{counts.get('upgrade', 0)} upgrades, {counts.get('downgrade', 0)} downgrades, "
+            f"{counts.get('installed', 0)} already installed. {len(selected)} selected, "
+            f"{format_size(sum(package['isize'] for package in selected))} installed size."
+            + (f" {len(self.errors)} archive(s) could not be read." if self.errors else "")
+        )
+        self.install_button.setEnabled(bool(selected))
+
+    def toggle_package(self, path):
+        self.package_model.toggle(path)
+        self.update_status()
+
+    def on_icons_ready(self, names):
+        self.package_view.viewport().update()
+
+    def install(self):
+        packages = self.package_model.selected_packages()
+        if packages:
+            self.parent.install_local_packages(packages)
+            self.close()
+
+    def on_finished(self):
+        self.parent.queries.cancel("local-import")
+        self.parent.icons.icons_ready.disconnect(self.on_icons_ready)
+
+
+class PackageState:
+    __slots__ = ("name", "categories", "installed_version", "available")
+
+    def __init__(self, name, installed_version=None):
+        self.name = name
+        self.categories = []
+        self.installed_version = installed_version
+        self.available = True
+
+    def is_installed(self):
+        return self.installed_version is not None
+
+
+class Catalog:
+    ALL_CATEGORY = "All Applications"
+
+    def __init__(self, path=None, snapshot=None):
+        if path is None:
+            base_dir = getattr(sys, "_MEIPASS", os.path.dirname(os.path.abspath(__file__)))
+            path = os.path.join(base_dir, "catalog.json")
+        self.path = path
+        self.categories = []
+        self.states = {}
+        self.catalog_states = []
+        self.installed = {}
+        self.data = {}
+        if snapshot is not None and snapshot["signature"] == self.signature():
+            self.load(snapshot["data"])
+        else:
+            self.load()
+
+    def signature(self):
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def snapshot(self):
+        return {"signature": self.signature(), "data": self.data}
+
+    def load(self, data=None):
+        if data is None:
+            try:
+                with open(self.path) as f:
+                    data = json.load(f)
+            except (OSError, ValueError):
+                data = {}
+        self.data = data
+        categories = list(data.get("categories", []))
+        for name, tags in data.get("packages", {}).items():
+            state = self.state(name)
+            if not state.categories:
+                self.catalog_states.append(state)
+            for tag in tags:
+                if tag not in state.categories:
+                    state.categories.append(tag)
+                if tag not in categories:
+                    categories.append(tag)
+        self.categories = categories + [self.ALL_CATEGORY]
+
+    def state(self, name):
+        state = self.states.get(name)
+        if state is None:
+            state = self.states[name] = PackageState(name, self.installed.get(name))
+        return state
+
+    def packages(self, category, include_unavailable=False):
+        return [state for state in self.catalog_states
+                if (include_unavailable or state.available)
+                and (category == self.ALL_CATEGORY or category in state.categories)]
+
+    def apply_installed(self, installed, names=None):
+        self.installed = installed
+        if names is None:
+            states = self.states.values()
+        else:
+            states = [self.states[name] for name in names if name in self.states]
+        changed = []
+        for state in states:
+            version = installed.get(state.name)
+            if version != state.installed_version:
+                state.installed_version = version
+                changed.append(state.name)
+        return changed
+
+    def restore_available(self, available):
+        for state in self.catalog_states:
+            state.available = available.get(state.name, True)
+
+    def apply_available(self, sync_db):
+        if not sync_db.is_loaded():
+            return
+        for state in self.catalog_states:
+            state.available = (state.name in sync_db.packages or state.name in sync_db.provides
+                               or state.is_installed())
+
+
+class StateSnapshot:
+    MAGIC = b"FKSNAP"
+    VERSION = 1
+    HEADER = struct.Struct("<6sI32s")
+
+    def __init__(self, cache_dir="~/.cache/fkinstall"):
+        self.path = os.path.join(os.path.expanduser(cache_dir), "snapshot.bin")
+
+    def load(self):
+        try:
+            with open(self.path, "rb") as f:
+                header = f.read(self.HEADER.size)
+                payload = f.read()
+        except OSError:
+            return None
+        if len(header) != self.HEADER.size:
+            return None
+        magic, version, checksum = self.HEADER.unpack(header)
+        if magic != self.MAGIC or version != self.VERSION or hashlib.sha256(payload).digest() != checksum:
+            return None
+        gc.disable()
         try:
-            result = subprocess.run(["pacman", "-Si", package_name], capture_output=True, text=True)
-            return result.stdout if result.returncode == 0 else "No information available."
+            return pickle.loads(payload)
         except Exception:
-            return "No information available."
+            return None
+        finally:
+            gc.enable()
+
+    def save(self, data):
+        payload = pickle.dumps(data, protocol=pickle.HIGHEST_PROTOCOL)
+        header = self.HEADER.pack(self.MAGIC, self.VERSION, hashlib.sha256(payload).digest())
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            tmp_file = self.path + ".tmp"
+            with open(tmp_file, "wb") as f:
+                f.write(header)
+                f.write(payload)
+            os.replace(tmp_file, self.path)
+        except OSError:
+            pass
+
+
+class PackageListModel(QAbstractListModel):
+    NameRole = Qt.UserRole + 1
+    InstalledRole = Qt.UserRole + 2
+    DetailRole = Qt.UserRole + 3
+
+    def __init__(self, window, states=()):
+        super().__init__()
+        self.window = window
+        self.states = list(states)
+        self.index_rows()
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.states)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        state = self.states[index.row()]
+        if role in (Qt.DisplayRole, self.NameRole):
+            return state.name
+        if role == Qt.DecorationRole:
+            return self.window.icons.pixmap(state.name)
+        if role == self.InstalledRole:
+            return state.is_installed()
+        if role == Qt.ToolTipRole:
+            paths = self.window.file_matches.get(state.name)
+            return "\n".join(paths) if paths else None
+        return None
+
+    def set_packages(self, states):
+        self.beginResetModel()
+        self.states = list(states)
+        self.index_rows()
+        self.endResetModel()
+
+    def append_packages(self, package_names):
+        if not package_names:
+            return
+        first = len(self.states)
+        self.beginInsertRows(QModelIndex(), first, first + len(package_names) - 1)
+        self.states.extend(self.window.catalog.state(name) for name in package_names)
+        self.index_rows(first)
+        self.endInsertRows()
+
+    def index_rows(self, first=0):
+        if first == 0:
+            self.rows = {}
+        for row in range(first, len(self.states)):
+            self.rows.setdefault(self.states[row].name, []).append(row)
+
+    def update_packages(self, package_names):
+        for name in package_names:
+            for row in self.rows.get(name, ()):
+                index = self.index(row)
+                self.dataChanged.emit(index, index, [self.InstalledRole])
+
+    def canFetchMore(self, parent):
+        return not parent.isValid() and self.window.can_fetch_more_results(self)
+
+    def fetchMore(self, parent):
+        self.window.fetch_more_results()
+
+
+class PackageDelegate(QStyledItemDelegate):
+    toggle_requested = pyqtSignal(str)
+
+    CARD_SIZE = QSize(300, 170)
+    KEY_ROLE = PackageListModel.NameRole
+    BUTTONS = {False: ("Install", "#4CAF50", "#45a049"), True: ("Remove", "#F44336", "#D32F2F")}
+
+    def sizeHint(self, option, index):
+        return self.CARD_SIZE
+
+    def card_rect(self, option):
+        return option.rect.adjusted(6, 6, -6, -6)
+
+    def button_rect(self, option):
+        rect = self.card_rect(option)
+        return QRect(rect.left() + 10, rect.bottom() - 42, rect.width() - 20, 32)
+
+    def paint(self, painter, option, index):
+        painter.save()
+        painter.setRenderHint(QPainter.Antialiasing)
+        rect = self.card_rect(option)
+        painter.setPen(Qt.NoPen)
+        painter.setBrush(QColor("#434C5E" if option.state & QStyle.State_Selected else "#3B4252"))
+        painter.drawRoundedRect(rect, 10, 10)
+        icon_rect = QRect(rect.center().x() - 32, rect.top() + 10, 64, 64)
+        painter.drawPixmap(icon_rect, index.data(Qt.DecorationRole))
+        font = painter.font()
+        font.setPixelSize(14)
+        painter.setFont(font)
+        painter.setPen(QColor("#ECEFF4"))
+        name_rect = QRect(rect.left() + 10, icon_rect.bottom() + 6, rect.width() - 20, 20)
+        name = painter.fontMetrics().elidedText(index.data(PackageListModel.NameRole), Qt.ElideRight,
+                                                name_rect.width())
+        painter.drawText(name_rect, Qt.AlignCenter, name)
+        detail = index.data(PackageListModel.DetailRole)
+        if detail:
+            font.setPixelSize(11)
+            painter.setFont(font)
+            painter.setPen(QColor("#D8DEE9"))
+            detail_rect = QRect(name_rect.left(), name_rect.bottom(), name_rect.width(), 15)
+            painter.drawText(detail_rect, Qt.AlignCenter,
+                             painter.fontMetrics().elidedText(detail, Qt.ElideMiddle, detail_rect.width()))
+            font.setPixelSize(14)
+            painter.setFont(font)
+        button_rect = self.button_rect(option)
+        hovered = bool(option.state & QStyle.State_MouseOver) and button_rect.contains(
+            option.widget.viewport().mapFromGlobal(QCursor.pos()))
+        text, color, hover_color = self.BUTTONS[bool(index.data(PackageListModel.InstalledRole))]
+        painter.setPen(Qt.NoPen)
+        painter.setBrush(QColor(hover_color if hovered else color))
+        painter.drawRoundedRect(button_rect, 5, 5)
+        painter.setPen(QColor("#FFFFFF"))
+        painter.drawText(button_rect, Qt.AlignCenter, text)
+        painter.restore()
+
+    def editorEvent(self, event, model, option, index):
+        if (event.type() == QEvent.MouseButtonRelease and event.button() == Qt.LeftButton
+                and self.button_rect(option).contains(event.pos())):
+            self.toggle_requested.emit(index.data(self.KEY_ROLE))
+            return True
+        return False
+
+
+class LocalPackageModel(QAbstractListModel):
+    PathRole = Qt.UserRole + 4
+
+    def __init__(self, window, repository):
+        super().__init__()
+        self.window = window
+        self.repository = repository
+        self.packages = []
+        self.rows = {}
+        self.selected = {}
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.packages)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        package = self.packages[index.row()]
+        if role in (Qt.DisplayRole, PackageListModel.NameRole):
+            return package["name"]
+        if role == Qt.DecorationRole:
+            return self.window.icons.pixmap(package["name"])
+        if role == PackageListModel.InstalledRole:
+            return self.selected.get(package["name"]) is package
+        if role == PackageListModel.DetailRole:
+            return self.describe(package)
+        if role == self.PathRole:
+            return package["path"]
+        if role == Qt.ToolTipRole:
+            return f"{package['description']}\n{package['path']}" if package["description"] else package["path"]
+        return None
+
+    def describe(self, package):
+        installed = package["installed_version"]
+        return {"new": f"{package['version']} (not installed)",
+                "upgrade": f"{installed} \u2192 {package['version']}",
+                "downgrade": f"{installed} \u2192 {package['version']} (downgrade)",
+                "installed": f"{package['version']} (installed)"}[package["status"]]
+
+    def append_packages(self, packages):
+        first = len(self.packages)
+        self.beginInsertRows(QModelIndex(), first, first + len(packages) - 1)
+        for row, package in enumerate(packages, first):
+            package["installed_version"] = self.window.installed_packages.version(package["name"])
+            package["status"] = self.repository.status(package, package["installed_version"])
+            self.packages.append(package)
+            self.rows.setdefault(package["name"], []).append(row)
+            current = self.selected.get(package["name"])
+            if package["status"] in ("new", "upgrade") and (
+                    current is None or vercmp(package["version"], current["version"]) > 0):
+                self.selected[package["name"]] = package
+        self.endInsertRows()
+
+    def toggle(self, path):
+        package = next(package for package in self.packages if package["path"] == path)
+        if self.selected.get(package["name"]) is package:
+            del self.selected[package["name"]]
+        else:
+            self.selected[package["name"]] = package
+        for row in self.rows[package["name"]]:
+            index = self.index(row)
+            self.dataChanged.emit(index, index, [PackageListModel.InstalledRole])
+
+    def selected_packages(self):
+        return [package for package in self.packages if self.selected.get(package["name"]) is package]
+
+    def counts(self):
+        counts = {}
+        for package in self.packages:
+            counts[package["status"]] = counts.get(package["status"], 0) + 1
+        return counts
+
+
+class LocalPackageDelegate(PackageDelegate):
+    KEY_ROLE = LocalPackageModel.PathRole
+    BUTTONS = {False: ("Select", "#4C566A", "#5E81AC"), True: ("Selected", "#4CAF50", "#45a049")}
+
+
+class PackageListView(QListView):
+    def __init__(self, window, states=()):
+        super().__init__()
+        self.window = window
+        self.package_model = PackageListModel(window, states)
+        self.delegate = PackageDelegate(self)
+        self.setModel(self.package_model)
+        self.setItemDelegate(self.delegate)
+        self.setViewMode(QListView.IconMode)
+        self.setResizeMode(QListView.Adjust)
+        self.setMovement(QListView.Static)
+        self.setUniformItemSizes(True)
+        self.setLayoutMode(QListView.Batched)
+        self.setBatchSize(200)
+        self.setGridSize(PackageDelegate.CARD_SIZE)
+        self.setMouseTracking(True)
+        self.setSelectionMode(QListView.SingleSelection)
+        self.setObjectName("packages")
+        self.delegate.toggle_requested.connect(self.toggle_package)
+        self.doubleClicked.connect(self.show_package_info)
+        self.prefetch_timer = QTimer(self)
+        self.prefetch_timer.setSingleShot(True)
+        self.prefetch_timer.setInterval(200)
+        self.prefetch_timer.timeout.connect(self.prefetch_details)
+        self.verticalScrollBar().valueChanged.connect(self.prefetch_timer.start)
+        self.package_model.modelReset.connect(self.prefetch_timer.start)
+        self.package_model.rowsInserted.connect(self.prefetch_timer.start)
+
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        self.prefetch_timer.start()
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        self.prefetch_timer.start()
+
+    def visible_packages(self):
+        first = self.indexAt(QPoint(8, 8))
+        if not first.isValid():
+            return []
+        grid = self.gridSize()
+        columns = max(1, self.viewport().width() // grid.width())
+        rows = self.viewport().height() // grid.height() + 2
+        states = self.package_model.states[first.row():first.row() + columns * rows]
+        return [state.name for state in states]
+
+    def prefetch_details(self):
+        if self.isVisible():
+            self.window.prefetch_details(self.visible_packages())
 
-    def is_package_installed(self):
-        try:
-            result = subprocess.run(["pacman", "-Q", self.package_name], capture_output=True, text=True)
-            return result.returncode == 0
-        except Exception:
-            return False
+    def mouseMoveEvent(self, event):
+        super().mouseMoveEvent(event)
+        index = self.indexAt(event.pos())
+        if index.isValid():
+            self.viewport().update(self.visualRect(index))
 
-    def update_button_state(self):
-        if self.is_package_installed():
-            self.install_button.setVisible(False)
-            self.remove_button.setVisible(True)
+    def toggle_package(self, package_name):
+        if self.window.installed_packages.is_installed(package_name):
+            self.window.remove_selected_package(package_name)
         else:
-            self.install_button.setVisible(True)
-            self.remove_button.setVisible(False)
-
-    def install_package(self):
-        self.parent.install_selected_package(self.package_name)
-        self.update_button_state()
+            self.window.install_selected_package(package_name)
 
-    def remove_package(self):
-        self.parent.remove_selected_package(self.package_name)
-        self.update_button_state()
+    def show_package_info(self, index):
+        dialog = PackageInfoDialog(index.data(PackageListModel.NameRole), self.window)
+        dialog.exec_()
 
 
-class PackageCard(QWidget):
-    def __init__(self, package_name, parent=None):
-        super().__init__(parent)
-        self.package_name = package_name
-        self.parent = parent
-        self.init_ui()
-        self.update_button_state()
+class SingleInstance(QObject):
+    arguments_received = pyqtSignal(list)
 
-    def init_ui(self):
-        layout = QVBoxLayout()
-        self.setStyleSheet(
-            """
-            background-color: #3B4252;
-            border-radius: 10px;
-            padding: 10px;
-            """
-        )
-        self.icon_label = QLabel()
-        self.icon_label.setPixmap(self.get_package_icon(self.package_name).pixmap(64, 64))
-        self.icon_label.setAlignment(Qt.AlignCenter)
-        layout.addWidget(self.icon_label)
-        self.label = QLabel(self.package_name)
-        self.label.setStyleSheet("font-size: 14px; color: #ECEFF4; text-align: center;")
-        layout.addWidget(self.label)
-        self.action_button = QPushButton()
-        self.action_button.setStyleSheet(
-            """
-            QPushButton {
-                font-size: 14px;
-                padding: 5px;
-                border-radius: 5px;
-                color: #FFFFFF;
-            }
-            QPushButton:hover {
-                background-color: #45a049;
-            }
-            """
-        )
-        self.action_button.clicked.connect(self.toggle_package)
-        layout.addWidget(self.action_button)
-        self.setLayout(layout)
+    CONNECT_TIMEOUT = 500
+    CLAIM_ATTEMPTS = 3
 
-    def get_package_icon(self, package_name):
-        icon = QIcon.fromTheme(package_name)
-        if icon.isNull():
-            icon = QIcon.fromTheme("applications-other")
-        return icon
+    def __init__(self, name=None):
+        super().__init__()
+        self.name = name or self.default_name()
+        self.server = None
 
-    def is_package_installed(self):
+    def default_name(self):
+        directory = os.environ.get("XDG_RUNTIME_DIR") or os.path.join(tempfile.gettempdir(), f"fkinstall-{os.getuid()}")
         try:
-            if self.parent.package_manager_switch.isChecked():
-                result = subprocess.run(["yay", "-Q", self.package_name], capture_output=True, text=True)
-            else:
-                result = subprocess.run(["pacman", "-Q", self.package_name], capture_output=True, text=True)
-            return result.returncode == 0
-        except Exception:
-            return False
+            os.makedirs(directory, mode=0o700, exist_ok=True)
+            if os.lstat(directory).st_uid == os.getuid():
+                return os.path.join(directory, "fkinstall.sock")
+        except OSError:
+            pass
+        return f"fkinstall-{os.getuid()}"
 
-    def update_button_state(self):
-        if self.is_package_installed():
-            self.action_button.setText("Remove")
-            self.action_button.setStyleSheet(
-                """
-                QPushButton {
-                    background-color: #F44336;
-                }
-                QPushButton:hover {
-                    background-color: #D32F2F;
-                }
-                """
-            )
-        else:
-            self.action_button.setText("Install")
-            self.action_button.setStyleSheet(
-                """
-                QPushButton {
-                    background-color: #4CAF50;
-                }
-                QPushButton:hover {
-                    background-color: #45a049;
-                }
-                """
-            )
+    def forward(self, arguments):
+        socket = QLocalSocket()
+        socket.connectToServer(self.name)
+        if not socket.waitForConnected(self.CONNECT_TIMEOUT):
+            return socket.error()
+        socket.write((json.dumps(arguments) + "\n").encode())
+        socket.waitForBytesWritten(self.CONNECT_TIMEOUT)
+        socket.disconnectFromServer()
+        return None
 
-    def toggle_package(self):
-        if self.is_package_installed():
-            self.parent.remove_selected_package(self.package_name)
-        else:
-            self.parent.install_selected_package(self.package_name)
-        self.update_button_state()
+    def claim(self, arguments):
+        server = QLocalServer(self)
+        for attempt in range(self.CLAIM_ATTEMPTS):
+            if server.listen(self.name):
+                self.server = server
+                self.server.newConnection.connect(self.on_new_connection)
+                return True
+            error = self.forward(arguments)
+            if error is None:
+                return False
+            if error in (QLocalSocket.ServerNotFoundError, QLocalSocket.ConnectionRefusedError):
+                QLocalServer.removeServer(self.name)
+        return True
 
-    def mouseDoubleClickEvent(self, event):
-        self.show_package_info()
+    def on_new_connection(self):
+        while self.server.hasPendingConnections():
+            socket = self.server.nextPendingConnection()
+            socket.readyRead.connect(lambda socket=socket: self.on_ready_read(socket))
+            socket.disconnected.connect(socket.deleteLater)
 
-    def show_package_info(self):
-        dialog = PackageInfoDialog(self.package_name, self.parent)
-        dialog.exec_()
+    def on_ready_read(self, socket):
+        if not socket.canReadLine():
+            return
+        try:
+            arguments = json.loads(bytes(socket.readLine()).decode())
+        except ValueError:
+            arguments = []
+        self.arguments_received.emit([str(argument) for argument in arguments])
 
 
 class FKInstall(QMainWindow):
+    SEARCH_DELAY = 150
+    SEARCH_CHUNK_SIZE = 200
+    SEARCH_RESULT_LIMIT = 200
+    DETAILS_BATCH_SIZE = 25
+    DB_CHANGE_DELAY = 500
+    UPDATE_CHECK_DELAY = 60 * 1000
+    UPDATE_CHECK_INTERVAL = 60 * 60 * 1000
+    AUR_REFRESH_CHECK_INTERVAL = 60 * 60 * 1000
+    PACKAGES_MODE = "Packages"
+    FILES_MODE = "Files"
+    STYLESHEET = """
+        QMainWindow, QDialog {
+            background-color: #2E3440;
+        }
+        QLabel {
+            color: #ECEFF4;
+            font-size: 16px;
+        }
+        QLineEdit {
+            background-color: #3B4252;
+            color: #ECEFF4;
+            border-radius: 5px;
+            padding: 5px;
+        }
+        QLineEdit#search {
+            font-size: 14px;
+            border: 1px solid #555;
+        }
+        QComboBox {
+            font-size: 14px;
+            padding: 5px;
+            border-radius: 5px;
+            border: 1px solid #555;
+            background-color: #3B4252;
+            color: #ECEFF4;
+        }
+        QPushButton {
+            font-size: 14px;
+            padding: 10px;
+            border-radius: 5px;
+            background-color: #4CAF50;
+            color: #FFFFFF;
+        }
+        QPushButton:hover {
+            background-color: #45a049;
+        }
+        QPushButton[compact="true"] {
+            font-size: 12px;
+            padding: 5px;
+        }
+        QPushButton[danger="true"], QPushButton[installed="true"] {
+            background-color: #F44336;
+        }
+        QPushButton[danger="true"]:hover, QPushButton[installed="true"]:hover {
+            background-color: #D32F2F;
+        }
+        QCheckBox {
+            font-size: 14px;
+            color: #ECEFF4;
+        }
+        QTabBar::tab {
+            background: #4C566A;
+            color: #ECEFF4;
+            padding: 10px;
+            border-top-left-radius: 5px;
+            border-top-right-radius: 5px;
+            font-size: 14px;
+        }
+        QTabBar::tab:selected {
+            background: #81A1C1;
+        }
+        QProgressBar {
+            border: 2px solid #555;
+            border-radius: 5px;
+            text-align: center;
+            font-size: 14px;
+            background-color: #2E3440;
+            color: #ECEFF4;
+        }
+        QProgressBar::chunk {
+            background-color: #88C0D0;
+            border-radius: 5px;
+        }
+        QPlainTextEdit#log {
+            font-family: monospace;
+            font-size: 12px;
+            background-color: #3B4252;
+            color: #ECEFF4;
+            border-radius: 5px;
+        }
+        QListWidget#transactions, QListWidget#files {
+            font-size: 13px;
+            background-color: #3B4252;
+            color: #ECEFF4;
+            border-radius: 5px;
+        }
+        QListView#packages {
+            background-color: #2E3440;
+            border: none;
+        }
+    """
+
     def __init__(self):
         super().__init__()
         self.setWindowTitle("Fikus Store")
@@ -234,474 +3364,752 @@ class FKInstall(QMainWindow):
         self.central_widget = QStackedWidget()
         self.setCentralWidget(self.central_widget)
         self.main_page = QWidget()
-        self.init_main_page()
+        with PROFILER.span("init_main_page"):
+            self.init_main_page()
+        PROFILER.count("widgets", len(self.findChildren(QWidget)))
         self.central_widget.addWidget(self.main_page)
-        self.log_file = os.path.expanduser("~/.local/share/fkinstall.log")
-        self.ensure_log_file_exists()
+        self.transaction_log = TransactionLog()
         self.config_dir = os.path.expanduser("~/.config/fkinstall")
         self.config_file = os.path.join(self.config_dir, "settings.json")
         self.ensure_config_dir_exists()
-        self.loading_dialog = LoadingDialog()
-        self.loading_dialog.show()
-        QApplication.processEvents()
-        self.init_categories()
-        self.loading_dialog.close()
-
-    def ensure_log_file_exists(self):
-        log_dir = os.path.dirname(self.log_file)
-        if not os.path.exists(log_dir):
-            os.makedirs(log_dir)
-        if not os.path.exists(self.log_file):
-            with open(self.log_file, "w") as f:
-                f.write("FKInstall Log\n")
-
-    def log_message(self, message):
-        with open(self.log_file, "a") as f:
-            f.write(f"{message}\n")
+        self.queries = QueryPool()
+        self.transactions = TransactionQueue(self.ask_password, self.confirm_transaction)
+        self.transactions.jobs_changed.connect(
+            lambda: self.transaction_panel.show_jobs(self.transactions.jobs))
+        self.transactions.transaction_started.connect(self.on_transaction_started)
+        self.transactions.transaction_finished.connect(self.on_transaction_finished)
+        self.transactions.transaction_failed.connect(self.on_transaction_failed)
+        self.transactions.transaction_cancelled.connect(self.on_transaction_cancelled)
+        self.transactions.transaction_recorded.connect(self.transaction_log.record)
+        self.transactions.output.connect(self.log_view.appendPlainText)
+        self.transactions.progress.connect(self.on_transaction_progress)
+        self.cancel_button.clicked.connect(self.transactions.cancel)
+        self.icons = IconService(self.queries)
+        self.icons.icons_ready.connect(self.on_icons_ready)
+        self.snapshot = StateSnapshot()
+        snapshot = self.snapshot.load()
+        if snapshot is None:
+            self.installed_packages = InstalledPackages()
+            self.catalog = Catalog()
+        else:
+            self.installed_packages = InstalledPackages(packages=snapshot["installed"])
+            self.catalog = Catalog(snapshot=snapshot["catalog"])
+            self.catalog.restore_available(snapshot["available"])
+        self.catalog.apply_installed(self.installed_packages.packages)
+        self.sync_db = SyncDatabase()
+        self.aur_index = AurIndex()
+        self.details = PackageDetailsCache(self.sync_db, self.aur_index)
+        if snapshot is not None:
+            self.details.signature = snapshot["sync_signature"]
+            self.details.put(snapshot["details"])
+            if snapshot["icon_cache"] == self.icons.cache_dir:
+                self.icons.preload(snapshot["icons"])
+        self.update_checker = UpdateChecker(self.installed_packages, self.sync_db)
+        self.dependency_graph = None
+        self.search_index = None
+        self.search_view = None
+        self.search_count = 0
+        self.search_notify = False
+        self.search_query = None
+        self.search_limit = 0
+        self.search_more = False
+        self.file_index = FileIndex(self.sync_db)
+        self.package_cache = PackageCache()
+        self.file_matches = {}
+        with PROFILER.span("init_categories"):
+            self.init_categories()
+        self.reload_sync_db()
+        self.init_db_watcher()
+        if snapshot is not None:
+            self.update_interface()
+        self.update_check_timer = QTimer(self)
+        self.update_check_timer.setInterval(self.UPDATE_CHECK_INTERVAL)
+        self.update_check_timer.timeout.connect(lambda: self.check_updates(refresh=True))
+        self.update_check_timer.start()
+        QTimer.singleShot(self.UPDATE_CHECK_DELAY, lambda: self.check_updates(refresh=True))
+        self.aur_refresh_timer = QTimer(self)
+        self.aur_refresh_timer.setInterval(self.AUR_REFRESH_CHECK_INTERVAL)
+        self.aur_refresh_timer.timeout.connect(self.refresh_aur_index)
+        self.aur_refresh_timer.start()
+
+    def init_db_watcher(self):
+        self.db_change_timer = QTimer(self)
+        self.db_change_timer.setSingleShot(True)
+        self.db_change_timer.setInterval(self.DB_CHANGE_DELAY)
+        self.db_change_timer.timeout.connect(self.update_interface)
+        self.sync_change_timer = QTimer(self)
+        self.sync_change_timer.setSingleShot(True)
+        self.sync_change_timer.setInterval(self.DB_CHANGE_DELAY)
+        self.sync_change_timer.timeout.connect(self.reload_sync_db)
+        self.db_watcher = QFileSystemWatcher(self)
+        for path in (self.installed_packages.db_path, self.sync_db.sync_path):
+            if os.path.isdir(path):
+                self.db_watcher.addPath(path)
+        self.db_watcher.directoryChanged.connect(self.on_db_directory_changed)
+
+    def on_db_directory_changed(self, path):
+        if path == self.sync_db.sync_path:
+            self.sync_change_timer.start()
+        else:
+            self.db_change_timer.start()
+
+    def closeEvent(self, event):
+        self.queries.cancel_all()
+        self.save_snapshot()
+        self.transaction_log.close()
+        super().closeEvent(event)
+
+    def save_snapshot(self):
+        details = {}
+        for state in self.catalog.catalog_states:
+            text = self.details.get(state.name)
+            if text is not None:
+                details[state.name] = text
+        self.snapshot.save({
+            "catalog": self.catalog.snapshot(),
+            "installed": self.installed_packages.packages,
+            "available": {state.name: state.available for state in self.catalog.catalog_states},
+            "sync_signature": self.details.signature,
+            "details": details,
+            "icon_cache": self.icons.cache_dir,
+            "icons": list(self.icons.pixmaps),
+        })
+
+    def open_arguments(self, arguments):
+        if self.isMinimized():
+            self.showNormal()
+        self.raise_()
+        self.activateWindow()
+        if len(arguments) >= 2 and arguments[0] == "--search":
+            self.search_input.setText(arguments[1])
+            self.on_search_enter_pressed()
+        elif arguments:
+            QTimer.singleShot(0, lambda: PackageInfoDialog(arguments[0], self).exec_())
+
+    def show_maintenance(self):
+        MaintenanceDialog(self).exec_()
+
+    def query_package_cache(self, task):
+        with PROFILER.span("package_cache_scan"):
+            packages = self.package_cache.scan(task)
+        yield packages
+
+    def clean_up(self, orphans, files):
+        self.transactions.enqueue("cleanup", None, False, {"packages": orphans, "files": files})
+
+    def show_mirrors(self):
+        MirrorDialog(self).exec_()
+
+    def query_mirror_ranking(self, task, ranker, servers):
+        with PROFILER.span("mirror_ranking", servers=len(servers)):
+            yield from ranker.rank(task, servers)
+
+    def write_mirrorlist(self, ranked_path, mirrorlist):
+        self.transactions.enqueue("mirrorlist", None, False, {"packages": [], "files": [ranked_path, mirrorlist]})
+
+    def import_local_packages(self):
+        directory = QFileDialog.getExistingDirectory(self, "Import Local Packages", os.path.expanduser("~"))
+        if directory:
+            LocalImportDialog(self, directory).exec_()
+
+    def query_local_repository(self, task, repository):
+        with PROFILER.span("local_repository_scan", path=repository.path):
+            yield from repository.scan(task)
+
+    def install_local_packages(self, packages):
+        self.transactions.enqueue("local-install", None, False, {
+            "packages": [package["name"] for package in packages],
+            "files": [package["path"] for package in packages],
+        })
+
+    def show_history(self):
+        entries = self.transaction_log.recent()
+        if not entries:
+            QMessageBox.information(self, "History", "No transactions recorded yet.")
+            return
+        message = QMessageBox(self)
+        message.setWindowTitle("History")
+        message.setText("\n".join(self.transaction_log.describe(entry) for entry in entries))
+        message.setDetailedText(entries[0]["output"])
+        message.exec_()
 
     def ensure_config_dir_exists(self):
         if not os.path.exists(self.config_dir):
             os.makedirs(self.config_dir)
 
     def set_style(self):
-        self.setStyleSheet(
-            """
-            QMainWindow {
-                background-color: #2E3440;
-            }
-            QLabel {
-                color: #ECEFF4;
-                font-size: 16px;
-            }
-            QLineEdit {
-                background-color: #3B4252;
-                color: #ECEFF4;
-                border-radius: 5px;
-                padding: 5px;
-            }
-            QPushButton {
-                font-size: 14px;
-                padding: 10px;
-                border-radius: 5px;
-                background-color: #4CAF50;
-                color: #FFFFFF;
-            }
-            QPushButton:hover {
-                background-color: #45a049;
-            }
-            QTabBar::tab {
-                background: #4C566A;
-                color: #ECEFF4;
-                padding: 10px;
-                border-top-left-radius: 5px;
-                border-top-right-radius: 5px;
-                font-size: 14px;
-            }
-            QTabBar::tab:selected {
-                background: #81A1C1;
-            }
-            QProgressBar {
-                border: 2px solid #555;
-                border-radius: 5px;
-                text-align: center;
-                font-size: 14px;
-                background-color: #2E3440;
-                color: #ECEFF4;
-            }
-            QProgressBar::chunk {
-                background-color: #88C0D0;
-                border-radius: 5px;
-            }
-            """
-        )
+        QApplication.instance().setStyleSheet(self.STYLESHEET)
 
     def init_main_page(self):
         layout = QVBoxLayout()
         search_layout = QHBoxLayout()
         self.search_input = QLineEdit()
         self.search_input.setPlaceholderText("Search packages...")
-        self.search_input.setStyleSheet(
-            """
-            font-size: 14px;
-            padding: 5px;
-            border-radius: 5px;
-            border: 1px solid #555;
-            background-color: #3B4252;
-            color: #ECEFF4;
-            """
-        )
+        self.search_input.setObjectName("search")
         self.search_input.returnPressed.connect(self.on_search_enter_pressed)
+        self.search_input.textChanged.connect(self.on_search_text_changed)
+        self.search_timer = QTimer(self)
+        self.search_timer.setSingleShot(True)
+        self.search_timer.setInterval(self.SEARCH_DELAY)
+        self.search_timer.timeout.connect(self.on_search_timeout)
         search_layout.addWidget(self.search_input)
+        self.search_mode = QComboBox()
+        self.search_mode.addItems([self.PACKAGES_MODE, self.FILES_MODE])
+        self.search_mode.currentIndexChanged.connect(self.on_search_mode_changed)
+        search_layout.addWidget(self.search_mode)
         self.update_button = QPushButton("Update System")
-        self.update_button.setStyleSheet(
-            """
-            QPushButton {
-                font-size: 12px;
-                padding: 5px;
-                border-radius: 5px;
-                background-color: #4CAF50;
-                color: #FFFFFF;
-            }
-            QPushButton:hover {
-                background-color: #45a049;
-            }
-            """
-        )
+        self.update_button.setProperty("compact", True)
         self.update_button.clicked.connect(self.update_system)
         search_layout.addWidget(self.update_button)
+        self.history_button = QPushButton("History")
+        self.history_button.setProperty("compact", True)
+        self.history_button.clicked.connect(self.show_history)
+        search_layout.addWidget(self.history_button)
+        self.maintenance_button = QPushButton("Maintenance")
+        self.maintenance_button.setProperty("compact", True)
+        self.maintenance_button.clicked.connect(self.show_maintenance)
+        search_layout.addWidget(self.maintenance_button)
+        self.import_button = QPushButton("Import")
+        self.import_button.setProperty("compact", True)
+        self.import_button.clicked.connect(self.import_local_packages)
+        search_layout.addWidget(self.import_button)
+        self.mirrors_button = QPushButton("Mirrors")
+        self.mirrors_button.setProperty("compact", True)
+        self.mirrors_button.clicked.connect(self.show_mirrors)
+        search_layout.addWidget(self.mirrors_button)
         layout.addLayout(search_layout)
         self.package_manager_switch = QCheckBox("Use yay instead of pacman")
-        self.package_manager_switch.setStyleSheet(
-            """
-            font-size: 14px;
-            color: #ECEFF4;
-            """
-        )
         self.package_manager_switch.setChecked(False)
+        self.package_manager_switch.toggled.connect(self.on_package_manager_toggled)
         layout.addWidget(self.package_manager_switch)
         self.tabs = QTabWidget()
-        self.tabs.setStyleSheet(
-            """
-            QTabBar::tab {
-                background: #4C566A;
-                color: #ECEFF4;
-                padding: 10px;
-                border-top-left-radius: 5px;
-                border-top-right-radius: 5px;
-                font-size: 14px;
-            }
-            QTabBar::tab:selected {
-                background: #81A1C1;
-            }
-            """
-        )
         layout.addWidget(self.tabs)
         self.progress_bar = QProgressBar()
-        self.progress_bar.setStyleSheet(
-            """
-            QProgressBar {
-                border: 2px solid #555;
-                border-radius: 5px;
-                text-align: center;
-                font-size: 14px;
-                background-color: #2E3440;
-                color: #ECEFF4;
-            }
-            QProgressBar::chunk {
-                background-color: #88C0D0;
-                border-radius: 5px;
-            }
-            """
-        )
         self.progress_bar.setVisible(False)
-        layout.addWidget(self.progress_bar)
+        progress_layout = QHBoxLayout()
+        progress_layout.addWidget(self.progress_bar)
+        self.cancel_button = QPushButton("Cancel")
+        self.cancel_button.setProperty("compact", True)
+        self.cancel_button.setProperty("danger", True)
+        self.cancel_button.setVisible(False)
+        progress_layout.addWidget(self.cancel_button)
+        layout.addLayout(progress_layout)
+        self.log_view = QPlainTextEdit()
+        self.log_view.setReadOnly(True)
+        self.log_view.setMaximumBlockCount(2000)
+        self.log_view.setMaximumHeight(150)
+        self.log_view.setObjectName("log")
+        self.log_view.setVisible(False)
+        layout.addWidget(self.log_view)
+        self.transaction_panel = TransactionPanel()
+        layout.addWidget(self.transaction_panel)
         self.main_page.setLayout(layout)
 
     def init_categories(self):
-        categories = {
-            "Internet": [
-                "firefox", "chromium", "thunderbird", "brave", "opera", "vivaldi", "tor-browser", "falkon",
-                "qutebrowser", "epiphany", "midori", "lynx", "links", "w3m", "surf", "dillo", "netsurf",
-                "palemoon", "waterfox", "basilisk", "otter-browser", "slimjet", "iridium", "ungoogled-chromium",
-                "seamonkey", "konqueror", "luakit", "arora", "qupzilla", "dooble", "uzbl", "min", "nyxt",
-                "elinks", "retawq", "edbrowse", "w3", "amaya", "dillo2", "kazehakase", "galeon", "rekonq"
-            ],
-            "Terminal": [
-                "vim", "emacs", "htop", "alacritty", "kitty", "tmux", "zsh", "fish", "bash", "neofetch",
-                "ranger", "ncdu", "glances", "btop", "lazygit", "tig", "micro", "nano", "mc", "terminator",
-                "tilix", "guake", "yakuake", "cool-retro-term", "hyper", "tabby", "wezterm", "xterm",
-                "rxvt", "st", "sakura", "eterm", "terminology", "gnome-terminal", "konsole", "xfce4-terminal",
-                "lxterminal", "mate-terminal", "deepin-terminal", "terminix", "blackbox", "alacritty", "kitty"
-            ],
-            "WM/DE": [
-                "cinnamon", "gnome", "kde-plasma", "xfce4", "i3", "awesome", "bspwm", "dwm", "qtile", "lxde",
-                "lxqt", "mate", "enlightenment", "openbox", "fluxbox", "icewm", "jwm", "pekwm", "spectrwm",
-                "herbstluftwm", "xmonad", "sway", "hyprland", "river", "wayfire", "weston", "labwc",
-                "budgie", "pantheon", "deepin", "lumina", "trinity", "ede", "ede2", "ede3", "ede4", "ede5"
-            ],
-            "Office": [
-                "libreoffice", "onlyoffice", "wps-office", "abiword", "gnumeric", "scribus", "latexila",
-                "lyx", "texmaker", "texstudio", "kile", "gummi", "focuswriter", "zathura", "calibre",
-                "okular", "evince", "masterpdfeditor", "xournalpp", "joplin", "cherrytree", "zim",
-                "notepadqq", "geany", "bluefish", "brackets", "atom", "sublime-text", "vscode", "codeblocks",
-                "qtcreator", "kdevelop", "anjuta", "glade", "arduino", "platformio", "rustup", "gcc", "clang"
-            ],
-            "Multimedia": [
-                "vlc", "audacity", "kdenlive", "obs-studio", "kodi", "handbrake", "ffmpeg", "gstreamer",
-                "mpv", "smplayer", "celluloid", "shotcut", "pitivi", "openshot", "blender", "gimp", "inkscape",
-                "darktable", "rawtherapee", "digikam", "krita", "mypaint", "pencil2d", "synfigstudio",
-                "ardour", "lmms", "musescore", "rosegarden", "hydrogen", "qtractor", "audacious", "clementine",
-                "rhythmbox", "amarok", "exaile", "guayadeque", "quodlibet", "deadbeef", "cmus", "mpd", "ncmpcpp"
-            ],
-            "Games": [
-                "steam", "lutris", "minecraft-launcher", "wine", "playonlinux", "retroarch", "dolphin-emu",
-                "pcsx2", "ppsspp", "mupen64plus", "scummvm", "dosbox", "openmw", "minetest", "supertuxkart",
-                "xonotic", "wesnoth", "0ad", "openttd", "freeciv", "warzone2100", "megaglest", "teeworlds",
-                "openra", "hedgewars", "armagetronad", "nethack", "angband", "dungeoncrawl", "cataclysm-dda",
-                "cogmind", "adom", "tome4", "nethack", "angband", "dungeoncrawl", "cataclysm-dda", "cogmind"
-            ],
-            "Development": [
-                "vscode", "sublime-text", "atom", "intellij-idea-community-edition", "pycharm-community-edition",
-                "eclipse", "netbeans", "codeblocks", "qtcreator", "kdevelop", "geany", "bluefish", "brackets",
-                "monodevelop", "anjuta", "glade", "arduino", "platformio", "rustup", "gcc", "clang", "llvm",
-                "cmake", "meson", "ninja", "git", "mercurial", "subversion", "docker", "podman", "kubernetes",
-                "ansible", "terraform", "vagrant", "packer", "puppet", "chef", "salt", "consul", "nomad", "vault"
-            ],
-            "System Utilities": [
-                "htop", "gnome-disk-utility", "gparted", "timeshift", "grub-customizer", "gnome-system-monitor",
-                "baobab", "stacer", "bleachbit", "grsync", "rsync", "timeshift", "cron", "systemd", "ufw",
-                "gufw", "firewalld", "nmap", "wireshark", "tcpdump", "htop", "iotop", "iftop", "nethogs",
-                "bmon", "glances", "neofetch", "screenfetch", "alsi", "archey", "inxi", "hardinfo", "lshw",
-                "lsof", "strace", "ltrace", "gdb", "valgrind", "perf", "sysstat", "dstat", "sar", "iostat"
-            ],
-            "Education": [
-                "kstars", "stellarium", "geogebra", "gcompris", "tuxmath", "tuxpaint", "kalzium", "kgeography",
-                "klettres", "kmplot", "kwordquiz", "step", "marble", "cantor", "libreoffice-math", "scilab",
-                "maxima", "wxmaxima", "octave", "rstudio", "jupyter-notebook", "moodle", "anki", "gperiodic"
-            ],
-            "Fonts": [
-                "ttf-dejavu", "ttf-liberation", "ttf-ubuntu-font-family", "ttf-fira-code", "ttf-font-awesome",
-                "ttf-roboto", "ttf-ms-fonts", "ttf-google-fonts-git", "ttf-nerd-fonts-symbols", "ttf-inconsolata",
-                "ttf-droid", "ttf-opensans", "ttf-lato", "ttf-jetbrains-mono", "ttf-hack", "ttf-cascadia-code",
-                "ttf-source-code-pro", "ttf-mononoki", "ttf-fantasque-sans-mono", "ttf-iosevka", "ttf-ibm-plex"
-            ],
-            "Icons": [
-                "papirus-icon-theme", "breeze-icons", "oxygen-icons", "numix-icon-theme", "faenza-icon-theme",
-                "moka-icon-theme", "elementary-icon-theme", "flat-remix-icon-theme", "la-capitaine-icon-theme",
-                "paper-icon-theme", "arc-icon-theme", "tela-icon-theme", "zafiro-icon-theme", "whitesur-icon-theme",
-                "suru-plus-aspromauros-icon-theme", "suru-plus-icon-theme", "yaru-icon-theme", "deepin-icon-theme",
-                "gnome-icon-theme", "gnome-icon-theme-extras", "gnome-icon-theme-symbolic", "gnome-icon-theme-legacy"
-            ],
-            "Themes": [
-                "arc-gtk-theme", "adapta-gtk-theme", "breeze-gtk", "materia-gtk-theme", "numix-gtk-theme",
-                "paper-gtk-theme", "plata-theme", "sweet-theme", "vimix-gtk-themes", "yaru-theme",
-                "deepin-gtk-theme", "gnome-themes-extra", "gnome-themes-standard", "gtk-theme-arc", "gtk-theme-elementary",
-                "gtk-theme-numix", "gtk-theme-orion", "gtk-theme-qogir", "gtk-theme-sierra", "gtk-theme-vimix"
-            ],
-            "All Applications": [
-                "firefox", "chromium", "thunderbird", "brave", "opera", "vivaldi", "tor-browser", "falkon",
-                "qutebrowser", "epiphany", "midori", "lynx", "links", "w3m", "surf", "dillo", "netsurf",
-                "palemoon", "waterfox", "basilisk", "otter-browser", "slimjet", "iridium", "ungoogled-chromium",
-                "seamonkey", "konqueror", "luakit", "arora", "qupzilla", "dooble", "uzbl", "min", "nyxt",
-                "elinks", "retawq", "edbrowse", "w3", "amaya", "dillo2", "kazehakase", "galeon", "rekonq",
-                "vim", "emacs", "htop", "alacritty", "kitty", "tmux", "zsh", "fish", "bash", "neofetch",
-                "ranger", "ncdu", "glances", "btop", "lazygit", "tig", "micro", "nano", "mc", "terminator",
-                "tilix", "guake", "yakuake", "cool-retro-term", "hyper", "tabby", "wezterm", "xterm",
-                "rxvt", "st", "sakura", "eterm", "terminology", "gnome-terminal", "konsole", "xfce4-terminal",
-                "lxterminal", "mate-terminal", "deepin-terminal", "terminix", "blackbox", "alacritty", "kitty",
-                "cinnamon", "gnome", "kde-plasma", "xfce4", "i3", "awesome", "bspwm", "dwm", "qtile", "lxde",
-                "lxqt", "mate", "enlightenment", "openbox", "fluxbox", "icewm", "jwm", "pekwm", "spectrwm",
-                "herbstluftwm", "xmonad", "sway", "hyprland", "river", "wayfire", "weston", "labwc",
-                "budgie", "pantheon", "deepin", "lumina", "trinity", "ede", "ede2", "ede3", "ede4", "ede5",
-                "libreoffice", "onlyoffice", "wps-office", "abiword", "gnumeric", "scribus", "latexila",
-                "lyx", "texmaker", "texstudio", "kile", "gummi", "focuswriter", "zathura", "calibre",
-                "okular", "evince", "masterpdfeditor", "xournalpp", "joplin", "cherrytree", "zim",
-                "notepadqq", "geany", "bluefish", "brackets", "atom", "sublime-text", "vscode", "codeblocks",
-                "qtcreator", "kdevelop", "anjuta", "glade", "arduino", "platformio", "rustup", "gcc", "clang",
-                "vlc", "audacity", "kdenlive", "obs-studio", "kodi", "handbrake", "ffmpeg", "gstreamer",
-                "mpv", "smplayer", "celluloid", "shotcut", "pitivi", "openshot", "blender", "gimp", "inkscape",
-                "darktable", "rawtherapee", "digikam", "krita", "mypaint", "pencil2d", "synfigstudio",
-                "ardour", "lmms", "musescore", "rosegarden", "hydrogen", "qtractor", "audacious", "clementine",
-                "rhythmbox", "amarok", "exaile", "guayadeque", "quodlibet", "deadbeef", "cmus", "mpd", "ncmpcpp",
-                "steam", "lutris", "minecraft-launcher", "wine", "playonlinux", "retroarch", "dolphin-emu",
-                "pcsx2", "ppsspp", "mupen64plus", "scummvm", "dosbox", "openmw", "minetest", "supertuxkart",
-                "xonotic", "wesnoth", "0ad", "openttd", "freeciv", "warzone2100", "megaglest", "teeworlds",
-                "openra", "hedgewars", "armagetronad", "nethack", "angband", "dungeoncrawl", "cataclysm-dda",
-                "cogmind", "adom", "tome4", "nethack", "angband", "dungeoncrawl", "cataclysm-dda", "cogmind",
-                "vscode", "sublime-text", "atom", "intellij-idea-community-edition", "pycharm-community-edition",
-                "eclipse", "netbeans", "codeblocks", "qtcreator", "kdevelop", "geany", "bluefish", "brackets",
-                "monodevelop", "anjuta", "glade", "arduino", "platformio", "rustup", "gcc", "clang", "llvm",
-                "cmake", "meson", "ninja", "git", "mercurial", "subversion", "docker", "podman", "kubernetes",
-                "ansible", "terraform", "vagrant", "packer", "puppet", "chef", "salt", "consul", "nomad", "vault",
-                "htop", "gnome-disk-utility", "gparted", "timeshift", "grub-customizer", "gnome-system-monitor",
-                "baobab", "stacer", "bleachbit", "grsync", "rsync", "timeshift", "cron", "systemd", "ufw",
-                "gufw", "firewalld", "nmap", "wireshark", "tcpdump", "htop", "iotop", "iftop", "nethogs",
-                "bmon", "glances", "neofetch", "screenfetch", "alsi", "archey", "inxi", "hardinfo", "lshw",
-                "lsof", "strace", "ltrace", "gdb", "valgrind", "perf", "sysstat", "dstat", "sar", "iostat",
-                "kstars", "stellarium", "geogebra", "gcompris", "tuxmath", "tuxpaint", "kalzium", "kgeography",
-                "klettres", "kmplot", "kwordquiz", "step", "marble", "cantor", "libreoffice-math", "scilab",
-                "maxima", "wxmaxima", "octave", "rstudio", "jupyter-notebook", "moodle", "anki", "gperiodic",
-                "ttf-dejavu", "ttf-liberation", "ttf-ubuntu-font-family", "ttf-fira-code", "ttf-font-awesome",
-                "ttf-roboto", "ttf-ms-fonts", "ttf-google-fonts-git", "ttf-nerd-fonts-symbols", "ttf-inconsolata",
-                "ttf-droid", "ttf-opensans", "ttf-lato", "ttf-jetbrains-mono", "ttf-hack", "ttf-cascadia-code",
-                "ttf-source-code-pro", "ttf-mononoki", "ttf-fantasque-sans-mono", "ttf-iosevka", "ttf-ibm-plex",
-                "papirus-icon-theme", "breeze-icons", "oxygen-icons", "numix-icon-theme", "faenza-icon-theme",
-                "moka-icon-theme", "elementary-icon-theme", "flat-remix-icon-theme", "la-capitaine-icon-theme",
-                "paper-icon-theme", "arc-icon-theme", "tela-icon-theme", "zafiro-icon-theme", "whitesur-icon-theme",
-                "suru-plus-aspromauros-icon-theme", "suru-plus-icon-theme", "yaru-icon-theme", "deepin-icon-theme",
-                "gnome-icon-theme", "gnome-icon-theme-extras", "gnome-icon-theme-symbolic", "gnome-icon-theme-legacy",
-                "arc-gtk-theme", "adapta-gtk-theme", "breeze-gtk", "materia-gtk-theme", "numix-gtk-theme",
-                "paper-gtk-theme", "plata-theme", "sweet-theme", "vimix-gtk-themes", "yaru-theme",
-                "deepin-gtk-theme", "gnome-themes-extra", "gnome-themes-standard", "gtk-theme-arc", "gtk-theme-elementary",
-                "gtk-theme-numix", "gtk-theme-orion", "gtk-theme-qogir", "gtk-theme-sierra", "gtk-theme-vimix"
-            ]
-        }
+        self.category_views = {}
+        for category in self.catalog.categories:
+            page = QWidget()
+            QVBoxLayout(page).setContentsMargins(0, 0, 0, 0)
+            self.tabs.addTab(page, category)
+        self.tabs.currentChanged.connect(self.category_view)
+        self.category_view(self.tabs.currentIndex())
+        QTimer.singleShot(0, self.prewarm_categories)
+
+    def category_view(self, index):
+        view = self.category_views.get(index)
+        if view is None:
+            with PROFILER.span("category_view", category=self.catalog.categories[index]):
+                view = PackageListView(self, self.category_packages(index))
+                self.tabs.widget(index).layout().addWidget(view)
+                self.category_views[index] = view
+            PROFILER.count("widgets", 1 + len(view.findChildren(QWidget)))
+        return view
+
+    def prewarm_categories(self):
+        for index in range(self.tabs.count()):
+            if index not in self.category_views:
+                self.category_view(index)
+                QTimer.singleShot(0, self.prewarm_categories)
+                return
+
+    def details_command(self):
+        return ["yay", "-Si"] if self.package_manager_switch.isChecked() else ["pacman", "-Si"]
+
+    def prefetch_details(self, package_names):
+        self.details.validate()
+        use_yay = self.package_manager_switch.isChecked()
+        package_names = [name for name in package_names if self.details.needs_fetch(name, use_yay)]
+        if package_names:
+            self.queries.submit("prefetch", self.query_details, package_names, on_chunk=self.details.put)
+
+    def query_details(self, task, package_names):
+        command = self.details_command()
+        for i in range(0, len(package_names), self.DETAILS_BATCH_SIZE):
+            yield self.details.fetch(task, package_names[i:i + self.DETAILS_BATCH_SIZE], command)
+
+    def on_icons_ready(self, names):
+        view = self.category_views.get(self.tabs.currentIndex())
+        if view is not None:
+            view.viewport().update()
+
+    def category_packages(self, index):
+        return self.catalog.packages(self.catalog.categories[index], self.package_manager_switch.isChecked())
+
+    def show_category(self, index):
+        self.category_view(index).package_model.set_packages(self.category_packages(index))
+
+    def refresh_categories(self):
+        for index, view in self.category_views.items():
+            if view is self.search_view and self.search_input.text().strip():
+                continue
+            states = self.category_packages(index)
+            if states != view.package_model.states:
+                view.package_model.set_packages(states)
+
+    def query_sync_db(self, task):
+        with PROFILER.span("sync_db_load"):
+            self.sync_db.load()
+        with PROFILER.span("search_index_build"):
+            self.search_index = SearchIndex(self.sync_db.packages.values())
+        yield self.search_index
 
-        for category, packages in categories.items():
-            scroll_area = QScrollArea()
-            scroll_area.setWidgetResizable(True)
-            scroll_content = QWidget()
-            scroll_layout = QGridLayout(scroll_content)
-            scroll_layout.setAlignment(Qt.AlignTop)
-            for i, package in enumerate(packages):
-                card = PackageCard(package, self)
-                scroll_layout.addWidget(card, i // 3, i % 3)
-            scroll_area.setWidget(scroll_content)
-            self.tabs.addTab(scroll_area, category)
+    def on_package_manager_toggled(self, checked):
+        self.refresh_categories()
+        if checked and not self.aur_index.is_loaded():
+            self.refresh_aur_index()
+
+    def refresh_aur_index(self):
+        if not self.package_manager_switch.isChecked() and not self.aur_index.is_loaded():
+            return
+        if self.aur_index.is_loaded() and not self.aur_index.is_stale():
+            return
+        if "aur" not in self.queries.tasks:
+            self.queries.submit("aur", self.query_aur_index, on_finished=self.on_aur_index_loaded)
+
+    def query_aur_index(self, task):
+        with PROFILER.span("aur_index_load"):
+            self.aur_index.refresh(task)
+        yield self.aur_index
+
+    def on_aur_index_loaded(self):
+        if self.search_input.text().strip() and self.package_manager_switch.isChecked():
+            self.search_timer.start()
+
+    def is_file_search(self):
+        return self.search_mode.currentText() == self.FILES_MODE
+
+    def on_search_mode_changed(self):
+        if self.is_file_search():
+            self.search_input.setPlaceholderText("Search files by name or path...")
+            if not self.file_index.is_loaded() and self.file_index.available():
+                self.load_file_index()
+        else:
+            self.search_input.setPlaceholderText("Search packages...")
+        if self.search_input.text().strip() and self.index_search_available():
+            self.search_timer.start()
+
+    def load_file_index(self):
+        if "files" not in self.queries.tasks:
+            self.queries.submit("files", self.query_file_index, on_finished=self.on_file_index_loaded)
+
+    def query_file_index(self, task):
+        with PROFILER.span("file_index_load"):
+            self.file_index.load(task)
+        yield self.file_index
+
+    def on_file_index_loaded(self):
+        query = self.search_input.text().strip()
+        if self.is_file_search() and query and self.file_index.is_loaded():
+            self.search_packages(query, notify=self.search_notify)
+        else:
+            self.set_search_busy(False)
+
+    def query_package_files(self, task, package_name):
+        if not self.file_index.available():
+            yield None
+            return
+        if not self.file_index.is_loaded():
+            with PROFILER.span("file_index_load"):
+                self.file_index.load(task)
+        yield self.file_index.files(package_name)
+
+    def query_search_files(self, task, query):
+        with PROFILER.span("search_files", query=query):
+            matches = self.file_index.search(query)
+        yield matches
+
+    def on_file_search_chunk(self, matches):
+        package_names = []
+        for path, package_name in matches:
+            if package_name not in self.file_matches:
+                self.file_matches[package_name] = []
+                package_names.append(package_name)
+            self.file_matches[package_name].append(path)
+        self.on_search_chunk(package_names)
+
+    def index_search_available(self):
+        if self.is_file_search():
+            return self.file_index.is_loaded()
+        if self.search_index is None:
+            return False
+        return not self.package_manager_switch.isChecked() or self.aur_index.is_loaded()
+
+    def check_updates(self, refresh=False):
+        running = self.queries.tasks.get("updates")
+        if running is not None and running.args[0] and not refresh:
+            return
+        self.queries.submit("updates", self.query_updates, refresh, on_chunk=self.on_updates_checked)
+
+    def query_updates(self, task, refresh):
+        yield self.update_checker.check(task, refresh)
+
+    def on_updates_checked(self, updates):
+        self.update_checker.updates = updates
+        self.update_checker.checked = True
+        self.update_button.setText(f"Update System ({len(updates)})" if updates else "Update System")
+        self.update_button.setToolTip(self.update_checker.summary())
+
+    def build_dependency_graph(self):
+        with PROFILER.span("dependency_graph_build"):
+            return DependencyGraph(self.installed_packages.load_records(), self.sync_db.packages,
+                                   self.sync_db.provides)
+
+    def get_dependency_graph(self):
+        if self.dependency_graph is None:
+            self.dependency_graph = self.build_dependency_graph()
+        return self.dependency_graph
+
+    def rebuild_dependency_graph(self):
+        self.dependency_graph = None
+        self.queries.submit("graph", self.query_dependency_graph, on_chunk=self.on_dependency_graph)
+
+    def query_dependency_graph(self, task):
+        yield self.build_dependency_graph()
+
+    def on_dependency_graph(self, graph):
+        self.dependency_graph = graph
+
+    def query_package_impact(self, task, package_name):
+        graph = self.dependency_graph or self.build_dependency_graph()
+        if package_name in graph.local:
+            yield graph.describe_removal(graph.removal_impact([package_name]))
+        else:
+            yield graph.describe_install(graph.install_plan([package_name]))
+
+    def confirm_transaction(self, action, package_names):
+        if action not in ("install", "remove"):
+            return True
+        graph = self.get_dependency_graph()
+        if action == "install":
+            if not self.sync_db.is_loaded():
+                return True
+            text = graph.describe_install(graph.install_plan(package_names))
+        else:
+            text = graph.describe_removal(graph.removal_impact(package_names))
+        answer = QMessageBox.question(
+            self, "Confirm", f"{action.capitalize()} {', '.join(package_names)}?\n\n{text}",
+            QMessageBox.Yes | QMessageBox.No
+        )
+        return answer == QMessageBox.Yes
+
+    def on_sync_db_loaded(self):
+        self.rebuild_dependency_graph()
+        self.check_updates()
+        self.details.validate()
+        self.catalog.apply_available(self.sync_db)
+        self.refresh_categories()
+        if self.search_input.text().strip() and self.index_search_available():
+            self.search_timer.start()
+
+    def on_search_text_changed(self):
+        if not self.index_search_available():
+            return
+        self.search_timer.start()
+
+    def on_search_timeout(self):
+        query = self.search_input.text().strip()
+        if query:
+            self.search_packages(query, notify=False)
+        else:
+            self.queries.cancel("search")
+            self.show_category(self.tabs.currentIndex())
 
     def on_search_enter_pressed(self):
+        self.search_timer.stop()
         query = self.search_input.text()
         if query:
-            self.progress_bar.setVisible(True)
-            self.progress_bar.setValue(0)
             self.search_packages(query)
         else:
-            self.clear_scroll_area(self.tabs.currentWidget())
+            self.queries.cancel("search")
+            self.show_category(self.tabs.currentIndex())
 
-    def search_packages(self, query):
-        try:
-            if self.package_manager_switch.isChecked():
-                result = subprocess.run(
-                    ["yay", "-Ss", query], capture_output=True, text=True, check=False
-                )
-            else:
-                result = subprocess.run(
-                    ["pacman", "-Ss", query], capture_output=True, text=True, check=False
-                )
-            
-            if not result.stdout:
-                QMessageBox.information(self, "Info", "No packages found.")
-                self.clear_scroll_area(self.tabs.currentWidget())
-                self.progress_bar.setVisible(False)
-                return
+    def search_packages(self, query, notify=True):
+        self.search_view = self.category_view(self.tabs.currentIndex())
+        self.search_count = 0
+        self.search_notify = notify
+        self.search_view.package_model.set_packages([])
+        self.search_query = query
+        self.search_limit = self.SEARCH_RESULT_LIMIT
+        self.search_more = False
+        self.file_matches = {}
+        if self.is_file_search():
+            self.search_files(query, notify)
+            return
+        self.set_search_busy(True)
+        use_yay = self.package_manager_switch.isChecked()
+        if self.index_search_available():
+            indexes = [self.search_index]
+            if use_yay:
+                indexes.append(self.aur_index.search_index)
+            function, arguments = self.query_search_index, (query, indexes, self.search_limit)
+        elif use_yay:
+            function, arguments = self.query_search_command, (["yay", "-Ss", query],)
+        else:
+            function, arguments = self.query_search_command, (["pacman", "-Ss", query],)
+        self.queries.submit("search", function, *arguments, on_chunk=self.on_search_chunk,
+                            on_finished=self.on_search_finished, on_error=self.on_search_error)
 
-            packages = result.stdout.splitlines()
-            self.clear_scroll_area(self.tabs.currentWidget())
-            scroll_content = self.tabs.currentWidget().widget()
-            scroll_layout = scroll_content.layout()
-
-            for package in packages:
-                if "/" in package:
-                    parts = package.split("/")
-                    if len(parts) > 1 and len(parts[1].split()) > 0:
-                        package_name = parts[1].split()[0]
-                        card = PackageCard(package_name, self)
-                        scroll_layout.addWidget(card)
-            self.progress_bar.setVisible(False)
-        except Exception as e:
-            QMessageBox.critical(self, "Error", f"Error searching for packages: {e}")
-            self.progress_bar.setVisible(False)
-
-    def clear_scroll_area(self, scroll_area):
-        scroll_content = scroll_area.widget()
-        if scroll_content:
-            scroll_layout = scroll_content.layout()
-            if scroll_layout:
-                while scroll_layout.count():
-                    item = scroll_layout.takeAt(0)
-                    widget = item.widget()
-                    if widget:
-                        widget.deleteLater()
+    def search_files(self, query, notify):
+        if self.file_index.is_loaded():
+            self.set_search_busy(True)
+            self.queries.submit("search", self.query_search_files, query, on_chunk=self.on_file_search_chunk,
+                                on_finished=self.on_search_finished, on_error=self.on_search_error)
+        elif self.file_index.available():
+            self.set_search_busy(True)
+            self.load_file_index()
+        elif notify:
+            QMessageBox.information(self, "Info", "File databases not found. Run 'pacman -Fy' to download them.")
 
-    def install_selected_package(self, package_name):
-        self.progress_bar.setVisible(True)
-        self.progress_bar.setValue(0)
+    def query_search_index(self, task, query, indexes, limit, skip=0):
+        with PROFILER.span("search_index", query=query):
+            package_names = []
+            seen = set()
+            for index in indexes:
+                for name in index.search(query, limit):
+                    if name not in seen:
+                        seen.add(name)
+                        package_names.append(name)
+            package_names = package_names[skip:limit]
+        for i in range(0, len(package_names), self.SEARCH_CHUNK_SIZE):
+            yield package_names[i:i + self.SEARCH_CHUNK_SIZE]
+
+    def can_fetch_more_results(self, model):
+        return (self.search_more and self.search_view is not None and self.search_view.package_model is model
+                and self.search_input.text().strip() == self.search_query and "search" not in self.queries.tasks)
+
+    def fetch_more_results(self):
+        if not self.index_search_available():
+            return
+        self.search_more = False
+        skip = self.search_limit
+        self.search_limit += self.SEARCH_RESULT_LIMIT
+        indexes = [self.search_index]
         if self.package_manager_switch.isChecked():
-            self.install_yay_package(package_name)
-        else:
-            self.install_pacman_package(package_name)
+            indexes.append(self.aur_index.search_index)
+        self.set_search_busy(True)
+        self.queries.submit("search", self.query_search_index, self.search_query, indexes, self.search_limit, skip,
+                            on_chunk=self.on_search_chunk, on_finished=self.on_search_finished,
+                            on_error=self.on_search_error)
 
-    def install_yay_package(self, package_name):
-        self.worker = Worker(["yay", "-S", "--noconfirm", package_name])
-        self.worker.finished.connect(self.on_install_finished)
-        self.worker.error.connect(self.on_install_error)
-        self.worker.start()
+    def query_search_command(self, task, command):
+        start = time.perf_counter()
+        process = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True)
+        task.process = process
+        package_names = []
+        for line in process.stdout:
+            if task.cancelled:
+                break
+            if line[:1].isspace() or "/" not in line:
+                continue
+            parts = line.split("/", 1)[1].split()
+            if parts:
+                package_names.append(parts[0])
+            if len(package_names) >= self.SEARCH_CHUNK_SIZE:
+                yield package_names
+                package_names = []
+        process.wait()
+        PROFILER.process_finished(command, start)
+        if package_names:
+            yield package_names
+        process.wait()
+
+    def on_search_chunk(self, package_names):
+        self.search_view.package_model.append_packages(package_names)
+        self.search_count += len(package_names)
+
+    def set_search_busy(self, busy):
+        if self.transactions.worker is not None:
+            return
+        self.progress_bar.setRange(0, 0 if busy else 100)
+        self.progress_bar.setFormat("%p%")
+        self.progress_bar.setVisible(busy)
+
+    def on_search_finished(self):
+        self.set_search_busy(False)
+        self.search_more = (not self.is_file_search() and self.index_search_available()
+                            and self.search_count >= self.search_limit)
+        if not self.search_count and self.search_notify:
+            QMessageBox.information(self, "Info", "No packages found.")
 
-    def install_pacman_package(self, package_name):
+    def on_search_error(self, error):
+        self.set_search_busy(False)
+        QMessageBox.critical(self, "Error", f"Error searching for packages: {error}")
+
+    def ask_password(self):
         password, ok = QInputDialog.getText(
             self, "Enter Password", "Enter your sudo password:", QLineEdit.Password
         )
-        if ok and password:
-            self.worker = Worker(["sudo", "-S", "pacman", "-S", "--noconfirm", package_name], password)
-            self.worker.finished.connect(self.on_install_finished)
-            self.worker.error.connect(self.on_install_error)
-            self.worker.start()
+        return password if ok else None
+
+    def install_selected_package(self, package_name):
+        self.transactions.enqueue("install", package_name, self.package_manager_switch.isChecked())
+
+    def remove_selected_package(self, package_name):
+        self.transactions.enqueue("remove", package_name, False)
+
+    def update_system(self):
+        if self.update_checker.checked:
+            message = QMessageBox(self)
+            message.setWindowTitle("Update System")
+            message.setText(self.update_checker.summary())
+            message.setInformativeText("Start the system upgrade?")
+            if self.update_checker.updates:
+                message.setDetailedText(self.update_checker.details())
+            message.setStandardButtons(QMessageBox.Yes | QMessageBox.No)
+            if message.exec_() != QMessageBox.Yes:
+                return
+        self.transactions.enqueue("upgrade", None, self.package_manager_switch.isChecked())
+
+    def on_transaction_started(self, action):
+        self.progress_bar.setRange(0, 100)
+        self.progress_bar.setValue(0)
+        self.progress_bar.setFormat("%p%")
+        self.progress_bar.setVisible(True)
+        self.cancel_button.setVisible(True)
+        self.log_view.clear()
+        self.log_view.setVisible(True)
+
+    def on_transaction_progress(self, value, label):
+        self.progress_bar.setValue(value)
+        self.progress_bar.setFormat(f"{label} %p%" if label else "%p%")
+
+    def on_transaction_cancelled(self, action):
+        self.progress_bar.setVisible(False)
+        self.cancel_button.setVisible(False)
+        self.update_interface()
+
+    def on_transaction_finished(self, action, output):
+        self.cancel_button.setVisible(False)
+        {"install": self.on_install_finished, "remove": self.on_remove_finished,
+         "upgrade": self.on_update_finished, "cleanup": self.on_cleanup_finished,
+         "local-install": self.on_local_install_finished,
+         "mirrorlist": self.on_mirrorlist_finished}[action](output)
+
+    def on_transaction_failed(self, action, error):
+        self.cancel_button.setVisible(False)
+        {"install": self.on_install_error, "remove": self.on_remove_error,
+         "upgrade": self.on_update_error, "cleanup": self.on_cleanup_error,
+         "local-install": self.on_local_install_error,
+         "mirrorlist": self.on_mirrorlist_error}[action](error)
 
     def on_install_finished(self, output):
         self.progress_bar.setVisible(False)
         QMessageBox.information(self, "Success", "Package installed successfully!")
-        self.log_message(f"Package installed: {output}")
         self.update_interface()
 
     def on_install_error(self, error):
         self.progress_bar.setVisible(False)
         QMessageBox.critical(self, "Error", f"Error installing package: {error}")
-        self.log_message(f"Error installing package: {error}")
-
-    def remove_selected_package(self, package_name):
-        password, ok = QInputDialog.getText(
-            self, "Enter Password", "Enter your sudo password:", QLineEdit.Password
-        )
-        if ok and password:
-            self.progress_bar.setVisible(True)
-            self.progress_bar.setValue(0)
-            self.worker = Worker(["sudo", "-S", "pacman", "-R", "--noconfirm", package_name], password)
-            self.worker.finished.connect(self.on_remove_finished)
-            self.worker.error.connect(self.on_remove_error)
-            self.worker.start()
 
     def on_remove_finished(self, output):
         self.progress_bar.setVisible(False)
         QMessageBox.information(self, "Success", "Package removed successfully!")
-        self.log_message(f"Package removed: {output}")
         self.update_interface()
 
     def on_remove_error(self, error):
         self.progress_bar.setVisible(False)
         QMessageBox.critical(self, "Error", f"Error removing package: {error}")
-        self.log_message(f"Error removing package: {error}")
 
     def update_interface(self):
-        for i in range(self.tabs.count()):
-            scroll_area = self.tabs.widget(i)
-            scroll_content = scroll_area.widget()
-            for j in range(scroll_content.layout().count()):
-                card = scroll_content.layout().itemAt(j).widget()
-                if isinstance(card, PackageCard):
-                    card.update_button_state()
+        self.queries.submit("installed", self.query_installed_packages, on_chunk=self.on_installed_packages)
 
-    def update_system(self):
-        self.progress_bar.setVisible(True)
-        self.progress_bar.setValue(0)
-        if self.package_manager_switch.isChecked():
-            self.worker = Worker(["yay", "-Syu", "--noconfirm"])
-        else:
-            password, ok = QInputDialog.getText(
-                self, "Enter Password", "Enter your sudo password:", QLineEdit.Password
-            )
-            if ok and password:
-                self.worker = Worker(["sudo", "-S", "pacman", "-Syu", "--noconfirm"], password)
-            else:
-                return
+    def query_installed_packages(self, task):
+        with PROFILER.span("installed_load"):
+            packages = self.installed_packages.load()
+        yield packages
 
-        self.worker.finished.connect(self.on_update_finished)
-        self.worker.error.connect(self.on_update_error)
-        self.worker.start()
+    def on_installed_packages(self, packages):
+        with PROFILER.span("installed_diff"):
+            added, removed, changed = self.installed_packages.diff(packages)
+        self.installed_packages.packages = packages
+        package_names = added + removed + changed
+        if not package_names:
+            return
+        self.catalog.apply_installed(packages, package_names)
+        for view in self.category_views.values():
+            view.package_model.update_packages(package_names)
+        self.rebuild_dependency_graph()
+        self.check_updates()
+
+    def reload_sync_db(self):
+        self.queries.submit("sync-db", self.query_sync_db, on_finished=self.on_sync_db_loaded)
+        if self.file_index.is_loaded():
+            self.load_file_index()
 
     def on_update_finished(self, output):
         self.progress_bar.setVisible(False)
         QMessageBox.information(self, "Success", "System updated successfully!")
-        self.log_message(f"System updated: {output}")
+        self.update_interface()
 
     def on_update_error(self, error):
         self.progress_bar.setVisible(False)
         QMessageBox.critical(self, "Error", f"Error updating system: {error}")
-        self.log_message(f"Error updating system: {error}")
+
+    def on_cleanup_finished(self, output):
+        self.progress_bar.setVisible(False)
+        QMessageBox.information(self, "Success", "Cleanup finished successfully!")
+        self.update_interface()
+
+    def on_cleanup_error(self, error):
+        self.progress_bar.setVisible(False)
+        QMessageBox.critical(self, "Error", f"Error cleaning up: {error}")
+        self.update_interface()
+
+    def on_local_install_finished(self, output):
+        self.progress_bar.setVisible(False)
+        QMessageBox.information(self, "Success", "Local packages installed successfully!")
+        self.update_interface()
+
+    def on_local_install_error(self, error):
+        self.progress_bar.setVisible(False)
+        QMessageBox.critical(self, "Error", f"Error installing local packages: {error}")
+
+    def on_mirrorlist_finished(self, output):
+        self.progress_bar.setVisible(False)
+        QMessageBox.information(self, "Success", "Mirrorlist updated successfully!")
+
+    def on_mirrorlist_error(self, error):
+        self.progress_bar.setVisible(False)
+        QMessageBox.critical(self, "Error", f"Error writing mirrorlist: {error}")
 
 
 if __name__ == "__main__":
+    multiprocessing.freeze_support()
+    arguments = sys.argv[1:]
+    if "--profile" in arguments:
+        arguments.remove("--profile")
+        PROFILER.enabled = True
     app = QApplication(sys.argv)
     app.setStyle("Fusion")
-    window = FKInstall()
+    instance = SingleInstance()
+    if not instance.claim(arguments):
+        sys.exit(0)
+    with PROFILER.span("startup"):
+        window = FKInstall()
+    instance.arguments_received.connect(window.open_arguments)
     window.show()
-    sys.exit(app.exec_())
+    if arguments:
+        window.open_arguments(arguments)
+    status = app.exec_()
+    PROFILER.save()
+    sys.exit(status)